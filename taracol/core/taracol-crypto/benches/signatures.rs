@@ -0,0 +1,62 @@
+use criterion::{black_box, criterion_group, criterion_main, BenchmarkId, Criterion, Throughput};
+use ed25519_dalek::{Signature, Signer, SigningKey, VerifyingKey};
+use taracol_crypto::{
+    encode_multibase_key, parse_multibase_key, verify, verify_batch, verify_many, KeyCache,
+    SignedMessage,
+};
+
+fn fixtures(n: usize) -> Vec<(VerifyingKey, Vec<u8>, Signature)> {
+    (0..n)
+        .map(|i| {
+            let mut seed = [0u8; 32];
+            seed[..8].copy_from_slice(&(i as u64).to_le_bytes());
+            let signing_key = SigningKey::from_bytes(&seed);
+            let message = format!("at://did:example:{i}/app.bsky.feed.post/{i}").into_bytes();
+            let signature = signing_key.sign(&message);
+            (signing_key.verifying_key(), message, signature)
+        })
+        .collect()
+}
+
+fn bench_verification(c: &mut Criterion) {
+    let mut group = c.benchmark_group("verify");
+    for n in [16usize, 128, 1024] {
+        let fixtures = fixtures(n);
+        let items: Vec<SignedMessage<'_>> = fixtures
+            .iter()
+            .map(|(key, message, signature)| SignedMessage { key, message, signature })
+            .collect();
+        group.throughput(Throughput::Elements(n as u64));
+        group.bench_with_input(BenchmarkId::new("single", n), &items, |b, items| {
+            b.iter(|| {
+                for item in items {
+                    verify(item.key, item.message, item.signature).unwrap();
+                }
+            })
+        });
+        group.bench_with_input(BenchmarkId::new("batch", n), &items, |b, items| {
+            b.iter(|| verify_batch(black_box(items)).unwrap())
+        });
+        group.bench_with_input(BenchmarkId::new("many", n), &items, |b, items| {
+            b.iter(|| verify_many(black_box(items)))
+        });
+    }
+    group.finish();
+}
+
+fn bench_keys(c: &mut Criterion) {
+    let (key, _, _) = fixtures(1).remove(0);
+    let multibase = encode_multibase_key(&key);
+    let cache = KeyCache::new(1024);
+    cache.insert("did:example:0", key);
+
+    c.bench_function("keys/parse_multibase", |b| {
+        b.iter(|| parse_multibase_key(black_box(&multibase)).unwrap())
+    });
+    c.bench_function("keys/cache_hit", |b| {
+        b.iter(|| cache.get_or_parse(black_box("did:example:0"), &multibase).unwrap())
+    });
+}
+
+criterion_group!(benches, bench_verification, bench_keys);
+criterion_main!(benches);
@@ -0,0 +1,35 @@
+//! Errors returned by key parsing and signature verification
+
+use std::fmt;
+
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub enum CryptoError {
+    /// Key is not base58btc multibase (`z...`) or failed to decode
+    InvalidEncoding,
+    /// Decoded key does not carry the ed25519-pub multicodec prefix
+    UnsupportedKeyType,
+    /// Key bytes are not a valid ed25519 point
+    InvalidKey,
+    /// Key is a small-order point, for which signatures can be forged
+    WeakKey,
+    /// Signature is not 64 bytes long
+    MalformedSignature,
+    /// Signature does not verify
+    BadSignature,
+}
+
+impl fmt::Display for CryptoError {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        let message = match self {
+            CryptoError::InvalidEncoding => "invalid multibase key encoding",
+            CryptoError::UnsupportedKeyType => "unsupported key type",
+            CryptoError::InvalidKey => "invalid ed25519 public key",
+            CryptoError::WeakKey => "weak (small-order) ed25519 public key",
+            CryptoError::MalformedSignature => "malformed signature",
+            CryptoError::BadSignature => "signature verification failed",
+        };
+        f.write_str(message)
+    }
+}
+
+impl std::error::Error for CryptoError {}
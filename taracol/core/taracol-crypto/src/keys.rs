@@ -1 +1,131 @@
-// TODO: Implement
+//! Ed25519 public key parsing and a per-DID cache of decoded keys
+
+use std::collections::HashMap;
+use std::sync::{PoisonError, RwLock};
+
+use ed25519_dalek::{VerifyingKey, PUBLIC_KEY_LENGTH};
+
+use crate::errors::CryptoError;
+
+/// Multicodec prefix for ed25519 public keys (`ed25519-pub`, varint 0xed)
+pub const ED25519_PUB_MULTICODEC: [u8; 2] = [0xed, 0x01];
+
+const MULTICODEC_KEY_LENGTH: usize = ED25519_PUB_MULTICODEC.len() + PUBLIC_KEY_LENGTH;
+
+/// Parse a base58btc multibase key (`z6Mk...`).
+///
+/// Decodes onto a stack buffer, so parsing never allocates. Small-order
+/// keys are rejected: any signature "verifies" under them in batch mode.
+pub fn parse_multibase_key(multibase: &str) -> Result<VerifyingKey, CryptoError> {
+    let encoded = multibase
+        .strip_prefix('z')
+        .ok_or(CryptoError::InvalidEncoding)?;
+    let mut buf = [0u8; MULTICODEC_KEY_LENGTH];
+    let len = bs58::decode(encoded)
+        .onto(&mut buf)
+        .map_err(|_| CryptoError::InvalidEncoding)?;
+    if len != MULTICODEC_KEY_LENGTH {
+        return Err(CryptoError::InvalidEncoding);
+    }
+    let (codec, key) = buf.split_at(ED25519_PUB_MULTICODEC.len());
+    if codec != ED25519_PUB_MULTICODEC {
+        return Err(CryptoError::UnsupportedKeyType);
+    }
+    let key: &[u8; PUBLIC_KEY_LENGTH] = key.try_into().map_err(|_| CryptoError::InvalidKey)?;
+    let key = VerifyingKey::from_bytes(key).map_err(|_| CryptoError::InvalidKey)?;
+    if key.is_weak() {
+        return Err(CryptoError::WeakKey);
+    }
+    Ok(key)
+}
+
+/// Parse a `did:key:z6Mk...` identifier.
+pub fn parse_did_key(did: &str) -> Result<VerifyingKey, CryptoError> {
+    let multibase = did
+        .strip_prefix("did:key:")
+        .ok_or(CryptoError::InvalidEncoding)?;
+    parse_multibase_key(multibase)
+}
+
+/// Encode a key as base58btc multibase, the inverse of `parse_multibase_key`.
+pub fn encode_multibase_key(key: &VerifyingKey) -> String {
+    let mut buf = [0u8; MULTICODEC_KEY_LENGTH];
+    buf[..ED25519_PUB_MULTICODEC.len()].copy_from_slice(&ED25519_PUB_MULTICODEC);
+    buf[ED25519_PUB_MULTICODEC.len()..].copy_from_slice(key.as_bytes());
+    format!("z{}", bs58::encode(buf).into_string())
+}
+
+/// Decoded verifying keys by DID.
+///
+/// Decompressing an ed25519 point costs about as much as a verification, so
+/// ingest paths that keep seeing the same authors should resolve keys here.
+/// Each entry remembers the multibase it was parsed from, so a DID whose
+/// signing key rotated is re-parsed on its next lookup.
+pub struct KeyCache {
+    keys: RwLock<HashMap<Box<str>, (Box<str>, VerifyingKey)>>,
+    capacity: usize,
+}
+
+impl KeyCache {
+    pub fn new(capacity: usize) -> Self {
+        Self {
+            keys: RwLock::new(HashMap::with_capacity(capacity.min(4096))),
+            capacity: capacity.max(1),
+        }
+    }
+
+    pub fn get(&self, did: &str) -> Option<VerifyingKey> {
+        let keys = self.keys.read().unwrap_or_else(PoisonError::into_inner);
+        keys.get(did).map(|(_, key)| *key)
+    }
+
+    /// Return the cached key for `did`, parsing `multibase` on a miss or
+    /// when it differs from the multibase the cached key came from.
+    pub fn get_or_parse(&self, did: &str, multibase: &str) -> Result<VerifyingKey, CryptoError> {
+        {
+            let keys = self.keys.read().unwrap_or_else(PoisonError::into_inner);
+            if let Some((cached, key)) = keys.get(did) {
+                if **cached == *multibase {
+                    return Ok(*key);
+                }
+            }
+        }
+        let key = parse_multibase_key(multibase)?;
+        self.store(did, multibase.into(), key);
+        Ok(key)
+    }
+
+    pub fn insert(&self, did: &str, key: VerifyingKey) {
+        self.store(did, encode_multibase_key(&key).into(), key);
+    }
+
+    fn store(&self, did: &str, multibase: Box<str>, key: VerifyingKey) {
+        let mut keys = self.keys.write().unwrap_or_else(PoisonError::into_inner);
+        if keys.len() >= self.capacity && !keys.contains_key(did) {
+            // Evict an arbitrary entry; keeps reads free of LRU bookkeeping
+            if let Some(victim) = keys.keys().next().cloned() {
+                keys.remove(&victim);
+            }
+        }
+        keys.insert(did.into(), (multibase, key));
+    }
+
+    pub fn invalidate(&self, did: &str) {
+        let mut keys = self.keys.write().unwrap_or_else(PoisonError::into_inner);
+        keys.remove(did);
+    }
+
+    pub fn len(&self) -> usize {
+        self.keys.read().unwrap_or_else(PoisonError::into_inner).len()
+    }
+
+    pub fn is_empty(&self) -> bool {
+        self.len() == 0
+    }
+}
+
+impl Default for KeyCache {
+    fn default() -> Self {
+        Self::new(100_000)
+    }
+}
@@ -1,8 +1,10 @@
 //! Cryptographic primitives for Taracol
 
+pub mod errors;
 pub mod signatures;
 pub mod keys;
 pub mod migration_proofs;
 
+pub use errors::*;
 pub use signatures::*;
 pub use keys::*;
@@ -1 +1,66 @@
-// TODO: Implement
+//! Single and batch ed25519 signature verification
+
+use ed25519_dalek::{Signature, VerifyingKey};
+
+use crate::errors::CryptoError;
+
+/// Items per `verify_batch` call in `verify_many`. One bad signature makes
+/// its whole chunk fall back to single verification, so this bounds that cost.
+pub const BATCH_CHUNK: usize = 128;
+
+/// One signed record awaiting verification
+#[derive(Clone, Copy)]
+pub struct SignedMessage<'a> {
+    pub key: &'a VerifyingKey,
+    pub message: &'a [u8],
+    pub signature: &'a Signature,
+}
+
+pub fn parse_signature(bytes: &[u8]) -> Result<Signature, CryptoError> {
+    Signature::from_slice(bytes).map_err(|_| CryptoError::MalformedSignature)
+}
+
+/// Strict single verification: rejects weak keys and small-order `R`, so
+/// every node reaches the same verdict on a record.
+pub fn verify(key: &VerifyingKey, message: &[u8], signature: &Signature) -> Result<(), CryptoError> {
+    key.verify_strict(message, signature)
+        .map_err(|_| CryptoError::BadSignature)
+}
+
+/// Verify all items in one multiscalar check.
+///
+/// Much cheaper per signature than `verify`, but only says whether every
+/// signature is valid, not which one is not; see `verify_many`. Batches with
+/// a weak key are refused outright: batch verification may accept a
+/// weak-key forgery depending on the other items, which `verify` never does.
+pub fn verify_batch(items: &[SignedMessage<'_>]) -> Result<(), CryptoError> {
+    if items.is_empty() {
+        return Ok(());
+    }
+    if items.iter().any(|item| item.key.is_weak()) {
+        return Err(CryptoError::WeakKey);
+    }
+    let messages: Vec<&[u8]> = items.iter().map(|item| item.message).collect();
+    let signatures: Vec<Signature> = items.iter().map(|item| *item.signature).collect();
+    let keys: Vec<VerifyingKey> = items.iter().map(|item| *item.key).collect();
+    ed25519_dalek::verify_batch(&messages, &signatures, &keys)
+        .map_err(|_| CryptoError::BadSignature)
+}
+
+/// Verify every item and report per-item results, batching in chunks of
+/// `BATCH_CHUNK` and re-checking a chunk one by one only when it fails.
+pub fn verify_many(items: &[SignedMessage<'_>]) -> Vec<bool> {
+    let mut results = Vec::with_capacity(items.len());
+    for chunk in items.chunks(BATCH_CHUNK) {
+        if verify_batch(chunk).is_ok() {
+            results.extend(std::iter::repeat(true).take(chunk.len()));
+        } else {
+            results.extend(
+                chunk
+                    .iter()
+                    .map(|item| verify(item.key, item.message, item.signature).is_ok()),
+            );
+        }
+    }
+    results
+}
@@ -0,0 +1,117 @@
+use ed25519_dalek::{Signature, Signer, SigningKey, VerifyingKey};
+use proptest::prelude::*;
+use taracol_crypto::*;
+
+fn records() -> impl Strategy<Value = Vec<([u8; 32], Vec<u8>)>> {
+    prop::collection::vec((any::<[u8; 32]>(), prop::collection::vec(any::<u8>(), 0..256)), 2..48)
+}
+
+fn sign_all(records: &[([u8; 32], Vec<u8>)]) -> Vec<(VerifyingKey, Signature)> {
+    records
+        .iter()
+        .map(|(seed, message)| {
+            let signing_key = SigningKey::from_bytes(seed);
+            (signing_key.verifying_key(), signing_key.sign(message))
+        })
+        .collect()
+}
+
+/// Identity public key with R = identity, s = 0: satisfies the permissive
+/// verification equation for every message.
+fn weak_key_forgery() -> (VerifyingKey, Signature) {
+    let mut identity = [0u8; 32];
+    identity[0] = 1;
+    let mut signature = [0u8; 64];
+    signature[0] = 1;
+    (VerifyingKey::from_bytes(&identity).unwrap(), Signature::from_bytes(&signature))
+}
+
+#[test]
+fn weak_keys_are_refused() {
+    let (weak_key, forged) = weak_key_forgery();
+
+    assert!(weak_key.is_weak());
+    assert_eq!(verify(&weak_key, b"anything", &forged), Err(CryptoError::BadSignature));
+    assert_eq!(parse_multibase_key(&encode_multibase_key(&weak_key)), Err(CryptoError::WeakKey));
+    assert!(KeyCache::new(4).get_or_parse("did:example:weak", &encode_multibase_key(&weak_key)).is_err());
+}
+
+proptest! {
+    #[test]
+    fn batch_accepts_valid_signatures(records in records()) {
+        let signed = sign_all(&records);
+        let items: Vec<_> = records
+            .iter()
+            .zip(&signed)
+            .map(|((_, message), (key, signature))| SignedMessage { key, message, signature })
+            .collect();
+
+        prop_assert!(verify_batch(&items).is_ok());
+        prop_assert!(verify_many(&items).iter().all(|ok| *ok));
+    }
+
+    #[test]
+    fn tampered_record_is_pinpointed(records in records(), victim in any::<prop::sample::Index>()) {
+        let signed = sign_all(&records);
+        let victim = victim.index(records.len());
+        let mut messages: Vec<Vec<u8>> = records.iter().map(|(_, message)| message.clone()).collect();
+        messages[victim].push(0xff);
+        let items: Vec<_> = messages
+            .iter()
+            .zip(&signed)
+            .map(|(message, (key, signature))| SignedMessage { key, message, signature })
+            .collect();
+
+        prop_assert!(verify_batch(&items).is_err());
+        for (index, ok) in verify_many(&items).into_iter().enumerate() {
+            prop_assert_eq!(ok, index != victim);
+        }
+    }
+
+    #[test]
+    fn weak_key_forgery_is_rejected_in_any_batch(records in records(), at in any::<prop::sample::Index>()) {
+        let (weak_key, forged) = weak_key_forgery();
+        let signed = sign_all(&records);
+        let mut items: Vec<_> = records
+            .iter()
+            .zip(&signed)
+            .map(|((_, message), (key, signature))| SignedMessage { key, message, signature })
+            .collect();
+        let at = at.index(items.len() + 1);
+        items.insert(at, SignedMessage { key: &weak_key, message: b"forged", signature: &forged });
+
+        prop_assert!(verify_batch(&items).is_err());
+        for (index, ok) in verify_many(&items).into_iter().enumerate() {
+            prop_assert_eq!(ok, index != at);
+        }
+    }
+
+    #[test]
+    fn multibase_round_trip(seed in any::<[u8; 32]>()) {
+        let key = SigningKey::from_bytes(&seed).verifying_key();
+        let encoded = encode_multibase_key(&key);
+
+        prop_assert!(encoded.starts_with("z6Mk"));
+        prop_assert_eq!(parse_multibase_key(&encoded).unwrap(), key);
+        prop_assert_eq!(parse_did_key(&format!("did:key:{encoded}")).unwrap(), key);
+    }
+
+    #[test]
+    fn arbitrary_input_never_panics(input in "z?[1-9A-Za-z]{0,64}") {
+        let _ = parse_multibase_key(&input);
+    }
+
+    #[test]
+    fn key_cache_follows_rotation(old in any::<[u8; 32]>(), new in any::<[u8; 32]>()) {
+        let old = SigningKey::from_bytes(&old).verifying_key();
+        let new = SigningKey::from_bytes(&new).verifying_key();
+        let cache = KeyCache::new(2);
+
+        prop_assert_eq!(cache.get_or_parse("did:example:a", &encode_multibase_key(&old)).unwrap(), old);
+        prop_assert_eq!(cache.get_or_parse("did:example:a", &encode_multibase_key(&new)).unwrap(), new);
+        prop_assert_eq!(cache.get("did:example:a"), Some(new));
+        prop_assert_eq!(cache.len(), 1);
+        // A malformed rotation is an error, never the previously cached key
+        prop_assert!(cache.get_or_parse("did:example:a", "not-a-key").is_err());
+    }
+}
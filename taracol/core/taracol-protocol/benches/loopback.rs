@@ -0,0 +1,109 @@
+//! Loopback QUIC benchmark between two local nodes: cold and 0-RTT resumed
+//! handshakes, then request throughput and latency over one multiplexed
+//! connection.
+//!
+//!     cargo bench -p taracol-protocol --bench loopback -- [messages=100000] [concurrency=64] [payload_bytes=512]
+
+use std::net::SocketAddr;
+use std::sync::Arc;
+use std::time::{Duration, Instant};
+
+use anyhow::Result;
+use taracol_protocol::{Identity, QuicTransport, TransportSettings};
+use tokio::task::JoinSet;
+
+const SERVER_NAME: &str = "localhost";
+
+fn dev_identity() -> Result<Identity> {
+    let cert = rcgen::generate_simple_self_signed(vec![SERVER_NAME.to_string()])?;
+    Ok(Identity {
+        cert_chain: vec![cert.serialize_der()?],
+        key: cert.serialize_private_key_der(),
+    })
+}
+
+fn percentile(sorted: &[Duration], p: f64) -> Duration {
+    sorted[((sorted.len() - 1) as f64 * p).round() as usize]
+}
+
+#[tokio::main]
+async fn main() -> Result<()> {
+    // cargo bench appends --bench; only positional numbers are ours
+    let mut args = std::env::args()
+        .skip(1)
+        .filter(|arg| !arg.starts_with("--"))
+        .map(|arg| arg.parse::<usize>());
+    let messages = args.next().transpose()?.unwrap_or(100_000);
+    let concurrency = args.next().transpose()?.unwrap_or(64).max(1);
+    let payload_bytes = args.next().transpose()?.unwrap_or(512);
+
+    let loopback: SocketAddr = "127.0.0.1:0".parse()?;
+    let server_identity = dev_identity()?;
+    let roots = server_identity.cert_chain.clone();
+    let server = Arc::new(QuicTransport::bind(
+        loopback,
+        server_identity,
+        &[],
+        TransportSettings::default(),
+    )?);
+    let server_addr = server.local_addr()?;
+    tokio::spawn({
+        let server = Arc::clone(&server);
+        async move { server.serve(|_, request| async move { Ok(request) }).await }
+    });
+    let client = Arc::new(QuicTransport::bind(
+        loopback,
+        dev_identity()?,
+        &roots,
+        TransportSettings::default(),
+    )?);
+
+    let started = Instant::now();
+    client.request(server_addr, SERVER_NAME, b"hello").await?;
+    let cold = started.elapsed();
+    client.disconnect(server_addr).await;
+    let started = Instant::now();
+    client.request(server_addr, SERVER_NAME, b"hello").await?;
+    let resumed = started.elapsed();
+
+    let payload: Arc<[u8]> = vec![0u8; payload_bytes].into();
+    let per_task = (messages / concurrency).max(1);
+    let started = Instant::now();
+    let mut tasks = JoinSet::new();
+    for _ in 0..concurrency {
+        let client = Arc::clone(&client);
+        let payload = Arc::clone(&payload);
+        tasks.spawn(async move {
+            let mut latencies = Vec::with_capacity(per_task);
+            for _ in 0..per_task {
+                let sent = Instant::now();
+                client.request(server_addr, SERVER_NAME, &payload).await?;
+                latencies.push(sent.elapsed());
+            }
+            Ok::<_, anyhow::Error>(latencies)
+        });
+    }
+    let mut latencies = Vec::with_capacity(per_task * concurrency);
+    while let Some(joined) = tasks.join_next().await {
+        latencies.extend(joined??);
+    }
+    let elapsed = started.elapsed();
+    latencies.sort_unstable();
+
+    println!("handshake:   cold {cold:.2?}, resumed (0-RTT) {resumed:.2?}");
+    println!(
+        "throughput:  {:.0} msg/s ({} x {payload_bytes} B, {concurrency} streams)",
+        latencies.len() as f64 / elapsed.as_secs_f64(),
+        latencies.len()
+    );
+    println!(
+        "latency:     p50 {:.2?}  p99 {:.2?}  max {:.2?}",
+        percentile(&latencies, 0.50),
+        percentile(&latencies, 0.99),
+        latencies[latencies.len() - 1]
+    );
+
+    client.shutdown().await;
+    server.shutdown().await;
+    Ok(())
+}
@@ -1 +1,54 @@
-// TODO: Implement
+//! Federation fan-out to peer nodes over the QUIC transport
+
+use std::net::SocketAddr;
+use std::sync::Arc;
+
+use anyhow::Result;
+use tokio::task::JoinSet;
+
+use crate::transport::QuicTransport;
+
+#[derive(Debug, Clone, PartialEq, Eq)]
+pub struct Peer {
+    pub addr: SocketAddr,
+    /// Name the peer's certificate is issued for
+    pub server_name: String,
+}
+
+pub struct Federation {
+    transport: Arc<QuicTransport>,
+    peers: Vec<Peer>,
+}
+
+impl Federation {
+    pub fn new(transport: Arc<QuicTransport>, peers: Vec<Peer>) -> Self {
+        Self { transport, peers }
+    }
+
+    pub fn peers(&self) -> &[Peer] {
+        &self.peers
+    }
+
+    /// Send `message` to every peer concurrently over their reused
+    /// connections, returning each peer's response in completion order.
+    pub async fn fan_out(&self, message: Arc<[u8]>) -> Vec<(Peer, Result<Vec<u8>>)> {
+        let mut requests = JoinSet::new();
+        for peer in self.peers.iter().cloned() {
+            let transport = Arc::clone(&self.transport);
+            let message = Arc::clone(&message);
+            requests.spawn(async move {
+                let response = transport.request(peer.addr, &peer.server_name, &message).await;
+                (peer, response)
+            });
+        }
+
+        let mut responses = Vec::with_capacity(self.peers.len());
+        while let Some(joined) = requests.join_next().await {
+            match joined {
+                Ok(response) => responses.push(response),
+                Err(error) => std::panic::resume_unwind(error.into_panic()),
+            }
+        }
+        responses
+    }
+}
@@ -1 +1,262 @@
-// TODO: Implement
+//! QUIC transport between Taracol nodes.
+//!
+//! One connection per peer is kept and reused, and every request runs on its
+//! own bidirectional stream, so concurrent messages to a peer are multiplexed
+//! without head-of-line blocking. Reconnects to a known peer resume the TLS
+//! session and send 0-RTT. Early data can be replayed by the network, so
+//! requests must be idempotent or deduplicated by the receiver.
+
+use std::collections::HashMap;
+use std::future::Future;
+use std::net::SocketAddr;
+use std::sync::{Arc, Mutex, PoisonError};
+use std::time::Duration;
+
+use anyhow::{anyhow, Result};
+use quinn::{Connecting, Connection, Endpoint, IdleTimeout, TransportConfig, VarInt};
+use tokio::sync::Mutex as AsyncMutex;
+use tracing::{debug, warn};
+
+pub const ALPN: &[u8] = b"taracol/1";
+
+#[derive(Debug, Clone)]
+pub struct TransportSettings {
+    /// Concurrent streams a peer may open on one connection
+    pub max_concurrent_streams: u32,
+    pub max_message_size: usize,
+    pub idle_timeout: Duration,
+    pub keep_alive: Duration,
+    pub enable_0rtt: bool,
+}
+
+impl Default for TransportSettings {
+    fn default() -> Self {
+        Self {
+            max_concurrent_streams: 1024,
+            max_message_size: 16 * 1024 * 1024,
+            idle_timeout: Duration::from_secs(30),
+            keep_alive: Duration::from_secs(10),
+            enable_0rtt: true,
+        }
+    }
+}
+
+impl TransportSettings {
+    fn transport_config(&self) -> Result<Arc<TransportConfig>> {
+        let mut config = TransportConfig::default();
+        config
+            .max_concurrent_bidi_streams(VarInt::from_u32(self.max_concurrent_streams))
+            .max_idle_timeout(Some(IdleTimeout::try_from(self.idle_timeout)?))
+            .keep_alive_interval(Some(self.keep_alive));
+        Ok(Arc::new(config))
+    }
+}
+
+/// DER-encoded TLS identity of a node
+#[derive(Clone)]
+pub struct Identity {
+    pub cert_chain: Vec<Vec<u8>>,
+    pub key: Vec<u8>,
+}
+
+pub struct QuicTransport {
+    endpoint: Endpoint,
+    settings: TransportSettings,
+    peers: Mutex<HashMap<SocketAddr, Arc<AsyncMutex<Option<Connection>>>>>,
+}
+
+impl QuicTransport {
+    /// Bind one endpoint that both accepts and dials, trusting peers whose
+    /// certificates chain to `trusted_roots` (DER).
+    pub fn bind(
+        addr: SocketAddr,
+        identity: Identity,
+        trusted_roots: &[Vec<u8>],
+        settings: TransportSettings,
+    ) -> Result<Self> {
+        let transport = settings.transport_config()?;
+
+        let cert_chain = identity.cert_chain.into_iter().map(rustls::Certificate).collect();
+        let mut server_crypto = rustls::ServerConfig::builder()
+            .with_safe_defaults()
+            .with_no_client_auth()
+            .with_single_cert(cert_chain, rustls::PrivateKey(identity.key))?;
+        server_crypto.alpn_protocols = vec![ALPN.to_vec()];
+        if settings.enable_0rtt {
+            server_crypto.max_early_data_size = u32::MAX;
+        }
+        let mut server_config = quinn::ServerConfig::with_crypto(Arc::new(server_crypto));
+        server_config.transport_config(Arc::clone(&transport));
+
+        let mut roots = rustls::RootCertStore::empty();
+        for root in trusted_roots {
+            roots
+                .add(&rustls::Certificate(root.clone()))
+                .map_err(|error| anyhow!("invalid trusted root: {error:?}"))?;
+        }
+        let mut client_crypto = rustls::ClientConfig::builder()
+            .with_safe_defaults()
+            .with_root_certificates(roots)
+            .with_no_client_auth();
+        client_crypto.alpn_protocols = vec![ALPN.to_vec()];
+        client_crypto.enable_early_data = settings.enable_0rtt;
+        let mut client_config = quinn::ClientConfig::new(Arc::new(client_crypto));
+        client_config.transport_config(transport);
+
+        let mut endpoint = Endpoint::server(server_config, addr)?;
+        endpoint.set_default_client_config(client_config);
+
+        Ok(Self {
+            endpoint,
+            settings,
+            peers: Mutex::new(HashMap::new()),
+        })
+    }
+
+    pub fn local_addr(&self) -> Result<SocketAddr> {
+        Ok(self.endpoint.local_addr()?)
+    }
+
+    /// The live connection to `addr`, dialing only when there is none.
+    /// Concurrent callers for the same peer share a single dial.
+    pub async fn connection(&self, addr: SocketAddr, server_name: &str) -> Result<Connection> {
+        let slot = {
+            let mut peers = self.peers.lock().unwrap_or_else(PoisonError::into_inner);
+            Arc::clone(peers.entry(addr).or_default())
+        };
+        let mut slot = slot.lock().await;
+        if let Some(connection) = slot.as_ref() {
+            if connection.close_reason().is_none() {
+                return Ok(connection.clone());
+            }
+        }
+
+        let connecting = self.endpoint.connect(addr, server_name)?;
+        let connection = if self.settings.enable_0rtt {
+            match connecting.into_0rtt() {
+                Ok((connection, _)) => {
+                    debug!(%addr, "resumed session with 0-RTT");
+                    connection
+                }
+                Err(connecting) => connecting.await?,
+            }
+        } else {
+            connecting.await?
+        };
+        *slot = Some(connection.clone());
+        Ok(connection)
+    }
+
+    /// Send `message` on a fresh stream and wait for the peer's response.
+    ///
+    /// Streams opened before a 0-RTT handshake settles fail if the server
+    /// rejects the early data; those are retried once over 1-RTT.
+    pub async fn request(&self, addr: SocketAddr, server_name: &str, message: &[u8]) -> Result<Vec<u8>> {
+        let connection = self.connection(addr, server_name).await?;
+        match self.exchange(&connection, message).await {
+            Err(error) if is_zero_rtt_rejected(&error) => {
+                debug!(%addr, "0-RTT rejected, retrying over 1-RTT");
+                self.exchange(&connection, message).await
+            }
+            result => result,
+        }
+    }
+
+    async fn exchange(&self, connection: &Connection, message: &[u8]) -> Result<Vec<u8>> {
+        let (mut send, mut recv) = connection.open_bi().await?;
+        send.write_all(message).await?;
+        // finish() resolves once the peer acks; read the response meanwhile
+        let (_, response) = tokio::try_join!(
+            async { send.finish().await.map_err(anyhow::Error::from) },
+            async {
+                recv.read_to_end(self.settings.max_message_size)
+                    .await
+                    .map_err(anyhow::Error::from)
+            },
+        )?;
+        Ok(response)
+    }
+
+    /// Close and forget the connection to `addr`; the next request redials.
+    pub async fn disconnect(&self, addr: SocketAddr) {
+        let slot = {
+            let peers = self.peers.lock().unwrap_or_else(PoisonError::into_inner);
+            peers.get(&addr).cloned()
+        };
+        if let Some(slot) = slot {
+            if let Some(connection) = slot.lock().await.take() {
+                connection.close(VarInt::from_u32(0), b"disconnect");
+            }
+        }
+    }
+
+    /// Accept peers and answer every incoming stream with `handler`.
+    pub async fn serve<H, F>(&self, handler: H) -> Result<()>
+    where
+        H: Fn(SocketAddr, Vec<u8>) -> F + Send + Sync + 'static,
+        F: Future<Output = Result<Vec<u8>>> + Send + 'static,
+    {
+        let handler = Arc::new(handler);
+        while let Some(connecting) = self.endpoint.accept().await {
+            let handler = Arc::clone(&handler);
+            let settings = self.settings.clone();
+            tokio::spawn(async move {
+                let connection = match accept(connecting, settings.enable_0rtt).await {
+                    Ok(connection) => connection,
+                    Err(error) => {
+                        debug!("handshake failed: {error:#}");
+                        return;
+                    }
+                };
+                let remote = connection.remote_address();
+                while let Ok((mut send, mut recv)) = connection.accept_bi().await {
+                    let handler = Arc::clone(&handler);
+                    let max_message_size = settings.max_message_size;
+                    tokio::spawn(async move {
+                        let result: Result<()> = async {
+                            let request = recv.read_to_end(max_message_size).await?;
+                            let response = handler(remote, request).await?;
+                            send.write_all(&response).await?;
+                            send.finish().await?;
+                            Ok(())
+                        }
+                        .await;
+                        if let Err(error) = result {
+                            warn!(%remote, "stream failed: {error:#}");
+                        }
+                    });
+                }
+            });
+        }
+        Ok(())
+    }
+
+    pub async fn shutdown(&self) {
+        self.endpoint.close(VarInt::from_u32(0), b"shutdown");
+        self.endpoint.wait_idle().await;
+    }
+}
+
+/// Whether a stream failed because the server refused the early data it
+/// was opened in
+fn is_zero_rtt_rejected(error: &anyhow::Error) -> bool {
+    matches!(error.downcast_ref(), Some(quinn::WriteError::ZeroRttRejected))
+        || matches!(
+            error.downcast_ref(),
+            Some(quinn::ReadToEndError::Read(quinn::ReadError::ZeroRttRejected))
+        )
+}
+
+async fn accept(connecting: Connecting, enable_0rtt: bool) -> Result<Connection> {
+    let connecting = if enable_0rtt {
+        // Always succeeds on the server side; early data is then readable
+        // before the handshake completes.
+        match connecting.into_0rtt() {
+            Ok((connection, _)) => return Ok(connection),
+            Err(connecting) => connecting,
+        }
+    } else {
+        connecting
+    };
+    Ok(connecting.await?)
+}
@@ -0,0 +1,5 @@
+//! Minimal single-node Taracol example
+
+fn main() {
+    // TODO: Implement
+}
@@ -0,0 +1,61 @@
+export type BatchFn<K, V> = (keys: K[]) => Promise<Map<K, V>>;
+
+interface Waiter<V> {
+  resolve: (value: V | undefined) => void;
+  reject: (error: unknown) => void;
+}
+
+/**
+ * Collects keys requested within `maxWaitMs` (or until `maxBatchSize` distinct
+ * keys are queued) and resolves them all with a single `batchFn` call.
+ */
+export class Batcher<K, V> {
+  private queue = new Map<K, Waiter<V>[]>();
+  private timer: ReturnType<typeof setTimeout> | null = null;
+
+  constructor(
+    private readonly batchFn: BatchFn<K, V>,
+    private readonly maxBatchSize = 25,
+    private readonly maxWaitMs = 5,
+  ) {}
+
+  load(key: K): Promise<V | undefined> {
+    return new Promise((resolve, reject) => {
+      const waiters = this.queue.get(key);
+      if (waiters) {
+        waiters.push({ resolve, reject });
+      } else {
+        this.queue.set(key, [{ resolve, reject }]);
+      }
+      if (this.queue.size >= this.maxBatchSize) {
+        this.flush();
+      } else if (this.timer === null) {
+        this.timer = setTimeout(() => this.flush(), this.maxWaitMs);
+      }
+    });
+  }
+
+  flush(): void {
+    if (this.timer !== null) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+    if (this.queue.size === 0) return;
+
+    const batch = this.queue;
+    this.queue = new Map();
+    this.batchFn([...batch.keys()]).then(
+      (results) => {
+        for (const [key, waiters] of batch) {
+          const value = results.get(key);
+          for (const waiter of waiters) waiter.resolve(value);
+        }
+      },
+      (error) => {
+        for (const waiters of batch.values()) {
+          for (const waiter of waiters) waiter.reject(error);
+        }
+      },
+    );
+  }
+}
@@ -0,0 +1,113 @@
+import axios, { type AxiosInstance, type AxiosRequestConfig } from 'axios';
+import { Batcher } from './batcher.js';
+import { LruCache } from './lru.js';
+
+export interface TaraClientOptions {
+  baseURL: string;
+  timeoutMs?: number;
+  cacheSize?: number;
+  cacheTtlMs?: number;
+  batchWindowMs?: number;
+  /**
+   * Keep-alive agents for Node (see `keepAliveAgents` in `@tara/api/node`).
+   * Browsers and React Native pool connections on their own.
+   */
+  httpAgent?: unknown;
+  httpsAgent?: unknown;
+}
+
+export interface Profile {
+  did: string;
+  handle: string;
+  displayName?: string;
+  avatar?: string;
+  [field: string]: unknown;
+}
+
+// Upper bound the gateway accepts for app.bsky.actor.getProfiles.
+const PROFILE_BATCH_LIMIT = 25;
+
+function requestKey(nsid: string, params: Record<string, unknown>): string {
+  const entries = Object.keys(params)
+    .sort()
+    .map((name) => [name, params[name]]);
+  return `${nsid}?${JSON.stringify(entries)}`;
+}
+
+export class TaraClient {
+  readonly http: AxiosInstance;
+  private readonly cache: LruCache<string, unknown>;
+  private readonly inFlight = new Map<string, Promise<unknown>>();
+  private readonly profiles: Batcher<string, Profile>;
+
+  constructor(options: TaraClientOptions) {
+    this.http = axios.create({
+      baseURL: options.baseURL,
+      timeout: options.timeoutMs ?? 10_000,
+      httpAgent: options.httpAgent,
+      httpsAgent: options.httpsAgent,
+      // XRPC expects repeated params (actors=a&actors=b), not actors[]=a.
+      paramsSerializer: { indexes: null },
+    });
+    this.cache = new LruCache(options.cacheSize ?? 500, options.cacheTtlMs ?? 30_000);
+    this.profiles = new Batcher(
+      (actors) => this.fetchProfiles(actors),
+      PROFILE_BATCH_LIMIT,
+      options.batchWindowMs ?? 5,
+    );
+  }
+
+  /** Cached XRPC query; identical concurrent calls share one request. */
+  query<T>(nsid: string, params: Record<string, unknown> = {}): Promise<T> {
+    const key = requestKey(nsid, params);
+    const cached = this.cache.get(key);
+    if (cached !== undefined) return Promise.resolve(cached as T);
+
+    const pending = this.inFlight.get(key);
+    if (pending) return pending as Promise<T>;
+
+    const request = this.http
+      .get<T>(`/xrpc/${nsid}`, { params })
+      .then((response) => {
+        this.cache.set(key, response.data);
+        return response.data;
+      })
+      .finally(() => this.inFlight.delete(key));
+    this.inFlight.set(key, request);
+    return request;
+  }
+
+  /** XRPC procedure; drops cached queries from the same namespace. */
+  async procedure<T>(nsid: string, body: unknown, config?: AxiosRequestConfig): Promise<T> {
+    const response = await this.http.post<T>(`/xrpc/${nsid}`, body, config);
+    const namespace = nsid.slice(0, nsid.lastIndexOf('.') + 1);
+    this.cache.invalidate((key) => key.startsWith(namespace));
+    return response.data;
+  }
+
+  /** Profile lookups made within the batch window share one getProfiles call. */
+  getProfile(actor: string): Promise<Profile | undefined> {
+    const cached = this.cache.get(requestKey('app.bsky.actor.getProfile', { actor }));
+    if (cached !== undefined) return Promise.resolve(cached as Profile);
+    return this.profiles.load(actor);
+  }
+
+  invalidate(nsidPrefix = ''): void {
+    this.cache.invalidate((key) => key.startsWith(nsidPrefix));
+  }
+
+  private async fetchProfiles(actors: string[]): Promise<Map<string, Profile>> {
+    const response = await this.http.get<{ profiles: Profile[] }>(
+      '/xrpc/app.bsky.actor.getProfiles',
+      { params: { actors } },
+    );
+    const byActor = new Map<string, Profile>();
+    for (const profile of response.data.profiles) {
+      for (const actor of [profile.did, profile.handle]) {
+        byActor.set(actor, profile);
+        this.cache.set(requestKey('app.bsky.actor.getProfile', { actor }), profile);
+      }
+    }
+    return byActor;
+  }
+}
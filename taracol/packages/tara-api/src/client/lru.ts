@@ -0,0 +1,50 @@
+interface Entry<V> {
+  value: V;
+  expiresAt: number;
+}
+
+/** Size-bounded LRU cache whose entries also expire after a TTL. */
+export class LruCache<K, V> {
+  private readonly entries = new Map<K, Entry<V>>();
+
+  constructor(
+    private readonly maxEntries = 500,
+    private readonly ttlMs = 30_000,
+  ) {}
+
+  get size(): number {
+    return this.entries.size;
+  }
+
+  get(key: K): V | undefined {
+    const entry = this.entries.get(key);
+    if (entry === undefined) return undefined;
+    this.entries.delete(key);
+    if (entry.expiresAt <= Date.now()) return undefined;
+    // Re-insert so Map iteration order tracks recency.
+    this.entries.set(key, entry);
+    return entry.value;
+  }
+
+  set(key: K, value: V, ttlMs = this.ttlMs): void {
+    this.entries.delete(key);
+    this.entries.set(key, { value, expiresAt: Date.now() + ttlMs });
+    if (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value as K);
+    }
+  }
+
+  delete(key: K): void {
+    this.entries.delete(key);
+  }
+
+  invalidate(predicate: (key: K) => boolean): void {
+    for (const key of this.entries.keys()) {
+      if (predicate(key)) this.entries.delete(key);
+    }
+  }
+
+  clear(): void {
+    this.entries.clear();
+  }
+}
@@ -0,0 +1,21 @@
+import http from 'node:http';
+import https from 'node:https';
+
+/**
+ * Keep-alive agents for Node consumers (SSR, tooling, tests):
+ * `new TaraClient({ baseURL, ...keepAliveAgents() })`.
+ * Kept out of the main entry so browser bundles never pull in node:http.
+ */
+export function keepAliveAgents(maxSockets = 64) {
+  const options = {
+    keepAlive: true,
+    keepAliveMsecs: 30_000,
+    maxSockets,
+    maxFreeSockets: Math.max(1, Math.floor(maxSockets / 4)),
+    scheduling: 'lifo' as const,
+  };
+  return {
+    httpAgent: new http.Agent(options),
+    httpsAgent: new https.Agent(options),
+  };
+}
@@ -0,0 +1,3 @@
+export * from './client/client.js';
+export * from './client/batcher.js';
+export * from './client/lru.js';
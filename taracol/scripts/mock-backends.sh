@@ -0,0 +1,43 @@
+#!/bin/bash
+# Run mock gRPC backends in place of the real services, for load testing
+# the gateway on one machine. Ports match the *_SERVICE_URL entries in
+# .env.example. Override a profile per service, e.g.
+#   AI_SERVICE_LATENCY=lognormal:80ms,1.0 MOCK_ERROR_RATE=0.05 ./scripts/mock-backends.sh
+
+set -e
+
+echo "🎭 Building mock backend..."
+cargo build --release -p mock-backend
+BIN=target/release/mock-backend
+
+pids=()
+trap 'kill "${pids[@]}" 2>/dev/null' EXIT INT TERM
+
+start() {
+    local name=$1 port=$2 latency=$3
+    shift 3
+    "$BIN" --service "$name" --listen "127.0.0.1:$port" --latency "$latency" \
+        --error-rate "${MOCK_ERROR_RATE:-0.01}" \
+        --spike-rate "${MOCK_SPIKE_RATE:-0.005}" --spike "${MOCK_SPIKE:-fixed:250ms}" \
+        "$@" &
+    pids+=($!)
+}
+
+start identity-service 50001 "${IDENTITY_SERVICE_LATENCY:-lognormal:3ms,0.5}" --payload-bytes 256..1024
+start web-service 50002 "${WEB_SERVICE_LATENCY:-lognormal:8ms,0.7}" --payload-bytes 512..16384
+start relay-service 50003 "${RELAY_SERVICE_LATENCY:-lognormal:5ms,0.6}" --payload-bytes 1024..8192
+start pds-service 50004 "${PDS_SERVICE_LATENCY:-lognormal:6ms,0.7}" --payload-bytes 512..65536
+start ai-service 50005 "${AI_SERVICE_LATENCY:-lognormal:40ms,0.9}" --payload-bytes 2048 --max-concurrency 64
+start federation-service 50006 "${FEDERATION_SERVICE_LATENCY:-lognormal:25ms,1.0}" --payload-bytes 512..4096
+
+# A mock that cannot bind its port exits at once; don't report success then
+sleep 1
+for pid in "${pids[@]}"; do
+    if ! kill -0 "$pid" 2>/dev/null; then
+        echo "❌ A mock backend failed to start (is its port already in use?)"
+        exit 1
+    fi
+done
+
+echo "✅ Mock backends running on ports 50001-50006 (Ctrl-C to stop)"
+wait
@@ -0,0 +1,76 @@
+//! Micro-batching benchmark for the ai-service inference queue, using the
+//! CPU-bound stub model (no GPU needed).
+//!
+//!     cargo run --release -p ai-service --example batching_bench -- \
+//!         [clients=256] [requests_per_client=100] [max_batch=32] [max_wait_us=2000]
+//!
+//! Runs unbatched (max_batch=1) and then batched, with the result cache off
+//! so every request reaches the model.
+
+use std::sync::Arc;
+use std::time::{Duration, Instant};
+
+use ai_service::batching::{BatchConfig, InferenceQueue};
+use ai_service::models::{RecommendationRequest, StubModel};
+use anyhow::Result;
+use tokio::task::JoinSet;
+
+fn percentile(sorted: &[Duration], p: f64) -> Duration {
+    sorted[((sorted.len() - 1) as f64 * p).round() as usize]
+}
+
+async fn run(label: &str, config: BatchConfig, clients: usize, per_client: usize) -> Result<()> {
+    let queue = Arc::new(InferenceQueue::start(StubModel::default(), config));
+    let started = Instant::now();
+    let mut tasks = JoinSet::new();
+    for client in 0..clients {
+        let queue = Arc::clone(&queue);
+        tasks.spawn(async move {
+            let mut latencies = Vec::with_capacity(per_client);
+            for i in 0..per_client {
+                let request = RecommendationRequest {
+                    did: format!("did:example:{}", client * per_client + i),
+                    limit: 20,
+                };
+                let sent = Instant::now();
+                queue.recommend(request).await?;
+                latencies.push(sent.elapsed());
+            }
+            Ok::<_, anyhow::Error>(latencies)
+        });
+    }
+    let mut latencies = Vec::with_capacity(clients * per_client);
+    while let Some(joined) = tasks.join_next().await {
+        latencies.extend(joined??);
+    }
+    let elapsed = started.elapsed();
+    latencies.sort_unstable();
+
+    println!(
+        "{label:<10} {:>8.0} req/s  mean batch {:>5.1}  p50 {:>9.2?}  p99 {:>9.2?}  p99.9 {:>9.2?}",
+        latencies.len() as f64 / elapsed.as_secs_f64(),
+        queue.stats().mean_batch_size(),
+        percentile(&latencies, 0.50),
+        percentile(&latencies, 0.99),
+        percentile(&latencies, 0.999),
+    );
+    Ok(())
+}
+
+#[tokio::main]
+async fn main() -> Result<()> {
+    let mut args = std::env::args().skip(1).map(|arg| arg.parse::<usize>());
+    let clients = args.next().transpose()?.unwrap_or(256).max(1);
+    let per_client = args.next().transpose()?.unwrap_or(100).max(1);
+    let max_batch_size = args.next().transpose()?.unwrap_or(32);
+    let max_wait = Duration::from_micros(args.next().transpose()?.unwrap_or(2000) as u64);
+
+    let base = BatchConfig {
+        max_wait,
+        cache_capacity: 0,
+        ..BatchConfig::default()
+    };
+    run("unbatched", BatchConfig { max_batch_size: 1, ..base.clone() }, clients, per_client).await?;
+    run("batched", BatchConfig { max_batch_size, ..base }, clients, per_client).await?;
+    Ok(())
+}
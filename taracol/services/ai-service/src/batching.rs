@@ -0,0 +1,235 @@
+//! Dynamic micro-batching in front of a `RecommendationModel`.
+//!
+//! Concurrent requests queue up and a collector groups them into batches of
+//! at most `max_batch_size`, waiting no longer than `max_wait` after the first
+//! request. A batch is only collected once a worker is free, so batches grow
+//! on their own under load and stay small (low latency) when idle. Hot
+//! results are served from a TTL cache without touching the model.
+
+use std::collections::HashMap;
+use std::fmt;
+use std::sync::atomic::{AtomicU64, Ordering};
+use std::sync::{Arc, Mutex, PoisonError};
+use std::time::Duration;
+
+use tokio::sync::{mpsc, oneshot, Semaphore};
+use tokio::time::Instant;
+
+use crate::models::{RecommendationModel, RecommendationRequest, Recommendations};
+
+#[derive(Debug, Clone)]
+pub struct BatchConfig {
+    pub max_batch_size: usize,
+    pub max_wait: Duration,
+    /// Batches run concurrently on this many blocking threads
+    pub workers: usize,
+    /// Requests waiting for a batch; beyond this `recommend` sheds load
+    pub queue_depth: usize,
+    /// Cached results; 0 disables the cache
+    pub cache_capacity: usize,
+    pub cache_ttl: Duration,
+}
+
+impl Default for BatchConfig {
+    fn default() -> Self {
+        Self {
+            max_batch_size: 32,
+            max_wait: Duration::from_millis(2),
+            workers: std::thread::available_parallelism().map_or(4, |n| n.get()),
+            queue_depth: 4096,
+            cache_capacity: 10_000,
+            cache_ttl: Duration::from_secs(60),
+        }
+    }
+}
+
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub enum InferenceError {
+    /// The queue is full; retry later or degrade
+    Overloaded,
+    Closed,
+}
+
+impl fmt::Display for InferenceError {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        match self {
+            InferenceError::Overloaded => f.write_str("inference queue is full"),
+            InferenceError::Closed => f.write_str("inference queue is closed"),
+        }
+    }
+}
+
+impl std::error::Error for InferenceError {}
+
+#[derive(Debug, Default)]
+pub struct BatchStats {
+    pub batches: AtomicU64,
+    pub requests: AtomicU64,
+    pub cache_hits: AtomicU64,
+}
+
+impl BatchStats {
+    pub fn mean_batch_size(&self) -> f64 {
+        let batches = self.batches.load(Ordering::Relaxed);
+        if batches == 0 {
+            return 0.0;
+        }
+        self.requests.load(Ordering::Relaxed) as f64 / batches as f64
+    }
+}
+
+type Job = (RecommendationRequest, oneshot::Sender<Arc<Recommendations>>);
+
+pub struct InferenceQueue {
+    sender: mpsc::Sender<Job>,
+    cache: Arc<ResultCache>,
+    stats: Arc<BatchStats>,
+}
+
+impl InferenceQueue {
+    /// Start the collector task; must be called inside a Tokio runtime.
+    pub fn start<M: RecommendationModel>(model: M, config: BatchConfig) -> Self {
+        let (sender, receiver) = mpsc::channel(config.queue_depth.max(1));
+        let cache = Arc::new(ResultCache::new(config.cache_capacity, config.cache_ttl));
+        let stats = Arc::new(BatchStats::default());
+        tokio::spawn(collect(
+            receiver,
+            Arc::new(model),
+            config,
+            Arc::clone(&cache),
+            Arc::clone(&stats),
+        ));
+        Self { sender, cache, stats }
+    }
+
+    pub async fn recommend(&self, request: RecommendationRequest) -> Result<Arc<Recommendations>, InferenceError> {
+        if let Some(hit) = self.cache.get(&request) {
+            self.stats.cache_hits.fetch_add(1, Ordering::Relaxed);
+            return Ok(hit);
+        }
+        let (reply, response) = oneshot::channel();
+        self.sender.try_send((request, reply)).map_err(|error| match error {
+            mpsc::error::TrySendError::Full(_) => InferenceError::Overloaded,
+            mpsc::error::TrySendError::Closed(_) => InferenceError::Closed,
+        })?;
+        response.await.map_err(|_| InferenceError::Closed)
+    }
+
+    pub fn stats(&self) -> &BatchStats {
+        &self.stats
+    }
+}
+
+async fn collect<M: RecommendationModel>(
+    mut receiver: mpsc::Receiver<Job>,
+    model: Arc<M>,
+    config: BatchConfig,
+    cache: Arc<ResultCache>,
+    stats: Arc<BatchStats>,
+) {
+    let workers = Arc::new(Semaphore::new(config.workers.max(1)));
+    let max_batch_size = config.max_batch_size.max(1);
+    loop {
+        // Take a worker first: while all are busy, requests pile up in the
+        // channel and the next batch is collected from that backlog at once.
+        let permit = Arc::clone(&workers)
+            .acquire_owned()
+            .await
+            .expect("worker semaphore is never closed");
+        let Some(first) = receiver.recv().await else {
+            return;
+        };
+        let deadline = Instant::now() + config.max_wait;
+        let mut batch = Vec::with_capacity(max_batch_size);
+        batch.push(first);
+        while batch.len() < max_batch_size {
+            match tokio::time::timeout_at(deadline, receiver.recv()).await {
+                Ok(Some(job)) => batch.push(job),
+                Ok(None) | Err(_) => break,
+            }
+        }
+
+        let model = Arc::clone(&model);
+        let cache = Arc::clone(&cache);
+        let stats = Arc::clone(&stats);
+        tokio::task::spawn_blocking(move || {
+            let _permit = permit;
+            run_batch(&*model, batch, &cache, &stats);
+        });
+    }
+}
+
+fn run_batch<M: RecommendationModel>(model: &M, batch: Vec<Job>, cache: &ResultCache, stats: &BatchStats) {
+    // Identical requests in one batch (hot users) are scored once
+    let mut slots = HashMap::with_capacity(batch.len());
+    let mut unique = Vec::with_capacity(batch.len());
+    for (request, _) in &batch {
+        slots.entry(request.clone()).or_insert_with(|| {
+            unique.push(request.clone());
+            unique.len() - 1
+        });
+    }
+
+    let outputs: Vec<Arc<Recommendations>> = model
+        .recommend_batch(&unique)
+        .into_iter()
+        .map(Arc::new)
+        .collect();
+    stats.batches.fetch_add(1, Ordering::Relaxed);
+    stats.requests.fetch_add(batch.len() as u64, Ordering::Relaxed);
+
+    for (request, output) in unique.into_iter().zip(&outputs) {
+        cache.insert(request, Arc::clone(output));
+    }
+    for (request, reply) in batch {
+        // The caller may have given up; nothing to do then
+        let _ = reply.send(Arc::clone(&outputs[slots[&request]]));
+    }
+}
+
+/// Bounded TTL cache of model outputs. Expired entries are dropped when a
+/// lookup finds them. When full, an arbitrary entry makes room: a wrong pick
+/// only costs that request a slot in some later batch.
+struct ResultCache {
+    entries: Mutex<HashMap<RecommendationRequest, (Arc<Recommendations>, Instant)>>,
+    capacity: usize,
+    ttl: Duration,
+}
+
+impl ResultCache {
+    fn new(capacity: usize, ttl: Duration) -> Self {
+        Self {
+            entries: Mutex::new(HashMap::with_capacity(capacity.min(4096))),
+            capacity,
+            ttl,
+        }
+    }
+
+    fn get(&self, request: &RecommendationRequest) -> Option<Arc<Recommendations>> {
+        if self.capacity == 0 {
+            return None;
+        }
+        let mut entries = self.entries.lock().unwrap_or_else(PoisonError::into_inner);
+        match entries.get(request) {
+            Some((output, expires)) if *expires > Instant::now() => Some(Arc::clone(output)),
+            Some(_) => {
+                entries.remove(request);
+                None
+            }
+            None => None,
+        }
+    }
+
+    fn insert(&self, request: RecommendationRequest, output: Arc<Recommendations>) {
+        if self.capacity == 0 {
+            return;
+        }
+        let mut entries = self.entries.lock().unwrap_or_else(PoisonError::into_inner);
+        if entries.len() >= self.capacity && !entries.contains_key(&request) {
+            if let Some(victim) = entries.keys().next().cloned() {
+                entries.remove(&victim);
+            }
+        }
+        entries.insert(request, (output, Instant::now() + self.ttl));
+    }
+}
@@ -3,5 +3,7 @@
 pub mod handlers;
 pub mod storage;
 pub mod config;
+pub mod models;
+pub mod batching;
 
 pub use handlers::*;
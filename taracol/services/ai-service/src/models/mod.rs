@@ -0,0 +1,70 @@
+//! Recommendation models behind the inference queue
+
+use std::time::{Duration, Instant};
+
+#[derive(Debug, Clone, PartialEq, Eq, Hash)]
+pub struct RecommendationRequest {
+    pub did: String,
+    pub limit: usize,
+}
+
+#[derive(Debug, Clone, PartialEq)]
+pub struct Recommendations {
+    /// (post URI, score), best first
+    pub items: Vec<(String, f32)>,
+}
+
+/// A model that scores a whole batch per call; output `i` answers input `i`.
+/// Called from blocking worker threads.
+pub trait RecommendationModel: Send + Sync + 'static {
+    fn recommend_batch(&self, requests: &[RecommendationRequest]) -> Vec<Recommendations>;
+}
+
+/// CPU-bound stand-in for a real model: a fixed cost per batch (weight loads,
+/// kernel launches) plus a cost per item, both spent spinning so the worker
+/// pool sees real contention. Output is deterministic per DID.
+#[derive(Debug, Clone)]
+pub struct StubModel {
+    pub per_batch: Duration,
+    pub per_item: Duration,
+}
+
+impl Default for StubModel {
+    fn default() -> Self {
+        Self {
+            per_batch: Duration::from_millis(2),
+            per_item: Duration::from_micros(100),
+        }
+    }
+}
+
+impl RecommendationModel for StubModel {
+    fn recommend_batch(&self, requests: &[RecommendationRequest]) -> Vec<Recommendations> {
+        spin(self.per_batch + self.per_item * requests.len() as u32);
+        requests
+            .iter()
+            .map(|request| {
+                let seed = request
+                    .did
+                    .bytes()
+                    .fold(0xcbf2_9ce4_8422_2325u64, |hash, byte| {
+                        (hash ^ u64::from(byte)).wrapping_mul(0x0100_0000_01b3)
+                    });
+                let items = (0..request.limit)
+                    .map(|rank| {
+                        let uri = format!("at://did:stub:{seed:x}/app.bsky.feed.post/{rank}");
+                        (uri, 1.0 / (rank as f32 + 1.0))
+                    })
+                    .collect();
+                Recommendations { items }
+            })
+            .collect()
+    }
+}
+
+fn spin(duration: Duration) {
+    let deadline = Instant::now() + duration;
+    while Instant::now() < deadline {
+        std::hint::spin_loop();
+    }
+}
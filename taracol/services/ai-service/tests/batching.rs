@@ -0,0 +1,158 @@
+use std::sync::{Arc, Mutex};
+use std::time::{Duration, Instant};
+
+use ai_service::batching::{BatchConfig, InferenceError, InferenceQueue};
+use ai_service::models::{RecommendationModel, RecommendationRequest, Recommendations};
+use tokio::task::JoinHandle;
+
+/// Records every batch it is given; holding `gate` stalls the worker
+#[derive(Clone, Default)]
+struct Recorder {
+    batches: Arc<Mutex<Vec<Vec<RecommendationRequest>>>>,
+    gate: Arc<Mutex<()>>,
+}
+
+impl Recorder {
+    fn batch_sizes(&self) -> Vec<usize> {
+        self.batches.lock().unwrap().iter().map(Vec::len).collect()
+    }
+}
+
+impl RecommendationModel for Recorder {
+    fn recommend_batch(&self, requests: &[RecommendationRequest]) -> Vec<Recommendations> {
+        let _open = self.gate.lock().unwrap();
+        self.batches.lock().unwrap().push(requests.to_vec());
+        requests
+            .iter()
+            .map(|request| Recommendations {
+                items: vec![(request.did.clone(), 1.0)],
+            })
+            .collect()
+    }
+}
+
+fn config(max_batch_size: usize, max_wait: Duration) -> BatchConfig {
+    BatchConfig {
+        max_batch_size,
+        max_wait,
+        workers: 1,
+        queue_depth: 64,
+        cache_capacity: 0,
+        cache_ttl: Duration::from_secs(60),
+    }
+}
+
+fn request(did: &str) -> RecommendationRequest {
+    RecommendationRequest {
+        did: did.to_string(),
+        limit: 10,
+    }
+}
+
+fn spawn_requests(
+    queue: &Arc<InferenceQueue>,
+    dids: &[&str],
+) -> Vec<JoinHandle<Result<Arc<Recommendations>, InferenceError>>> {
+    dids.iter()
+        .map(|did| {
+            let queue = Arc::clone(queue);
+            let request = request(did);
+            tokio::spawn(async move { queue.recommend(request).await })
+        })
+        .collect()
+}
+
+#[tokio::test]
+async fn identical_requests_in_a_batch_are_scored_once() {
+    let model = Recorder::default();
+    let queue = Arc::new(InferenceQueue::start(model.clone(), config(8, Duration::from_millis(50))));
+
+    let dids = ["did:example:hot", "did:example:hot", "did:example:cold", "did:example:hot"];
+    for (did, task) in dids.iter().zip(spawn_requests(&queue, &dids)) {
+        assert_eq!(task.await.unwrap().unwrap().items[0].0, *did);
+    }
+    assert_eq!(model.batch_sizes(), vec![2]);
+    assert_eq!(queue.stats().mean_batch_size(), 4.0);
+}
+
+#[tokio::test]
+async fn batches_stop_at_max_batch_size() {
+    let model = Recorder::default();
+    let queue = Arc::new(InferenceQueue::start(model.clone(), config(4, Duration::from_millis(50))));
+
+    let dids: Vec<String> = (0..10).map(|i| format!("did:example:{i}")).collect();
+    let dids: Vec<&str> = dids.iter().map(String::as_str).collect();
+    for task in spawn_requests(&queue, &dids) {
+        task.await.unwrap().unwrap();
+    }
+    let sizes = model.batch_sizes();
+    assert!(sizes.iter().all(|size| *size <= 4), "{sizes:?}");
+    assert_eq!(sizes.iter().sum::<usize>(), 10);
+    assert_eq!(sizes[0], 4);
+}
+
+#[tokio::test]
+async fn partial_batch_runs_after_max_wait() {
+    let model = Recorder::default();
+    let max_wait = Duration::from_millis(30);
+    let queue = InferenceQueue::start(model.clone(), config(32, max_wait));
+
+    let started = Instant::now();
+    queue.recommend(request("did:example:a")).await.unwrap();
+    let elapsed = started.elapsed();
+    assert!(elapsed >= max_wait, "{elapsed:?}");
+    assert!(elapsed < max_wait * 10, "{elapsed:?}");
+
+    // Arrives after the first deadline, so it gets a batch of its own
+    tokio::time::sleep(max_wait * 2).await;
+    queue.recommend(request("did:example:b")).await.unwrap();
+    assert_eq!(model.batch_sizes(), vec![1, 1]);
+}
+
+#[tokio::test]
+async fn full_queue_sheds_load() {
+    let model = Recorder::default();
+    let config = BatchConfig {
+        queue_depth: 2,
+        ..config(1, Duration::from_millis(1))
+    };
+    let queue = Arc::new(InferenceQueue::start(model.clone(), config));
+
+    // Stall the only worker on the first request, then fill the queue
+    let gate = model.gate.lock().unwrap();
+    let mut tasks = spawn_requests(&queue, &["did:example:0"]);
+    tokio::time::sleep(Duration::from_millis(20)).await;
+    tasks.extend(spawn_requests(&queue, &["did:example:1", "did:example:2"]));
+    tokio::time::sleep(Duration::from_millis(20)).await;
+
+    assert_eq!(
+        queue.recommend(request("did:example:3")).await.unwrap_err(),
+        InferenceError::Overloaded
+    );
+
+    drop(gate);
+    for task in tasks {
+        task.await.unwrap().unwrap();
+    }
+}
+
+#[tokio::test]
+async fn cached_results_expire_after_ttl() {
+    let model = Recorder::default();
+    let ttl = Duration::from_millis(50);
+    let config = BatchConfig {
+        cache_capacity: 16,
+        cache_ttl: ttl,
+        ..config(8, Duration::from_millis(1))
+    };
+    let queue = InferenceQueue::start(model.clone(), config);
+
+    queue.recommend(request("did:example:a")).await.unwrap();
+    queue.recommend(request("did:example:a")).await.unwrap();
+    assert_eq!(queue.stats().cache_hits.load(std::sync::atomic::Ordering::Relaxed), 1);
+    assert_eq!(model.batch_sizes().len(), 1);
+
+    tokio::time::sleep(ttl * 2).await;
+    queue.recommend(request("did:example:a")).await.unwrap();
+    assert_eq!(model.batch_sizes().len(), 2);
+}
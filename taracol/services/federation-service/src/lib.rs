@@ -3,5 +3,6 @@
 pub mod handlers;
 pub mod storage;
 pub mod config;
+pub mod quic;
 
 pub use handlers::*;
@@ -0,0 +1,35 @@
+//! QUIC endpoint for node-to-node federation traffic
+
+use std::net::SocketAddr;
+use std::sync::Arc;
+
+use anyhow::{Context, Result};
+use taracol_protocol::{Identity, QuicTransport, TransportSettings};
+
+fn env_path(name: &str) -> Result<Vec<u8>> {
+    let path = std::env::var(name).with_context(|| format!("{name} is not set"))?;
+    std::fs::read(&path).with_context(|| format!("reading {name}={path}"))
+}
+
+/// Bind the federation endpoint from FEDERATION_QUIC_ADDR and the DER files
+/// named by FEDERATION_TLS_CERT, FEDERATION_TLS_KEY and FEDERATION_TLS_ROOTS
+/// (comma-separated).
+pub fn bind_from_env() -> Result<Arc<QuicTransport>> {
+    let addr: SocketAddr = std::env::var("FEDERATION_QUIC_ADDR")
+        .unwrap_or_else(|_| "0.0.0.0:4433".to_string())
+        .parse()
+        .context("FEDERATION_QUIC_ADDR")?;
+    let identity = Identity {
+        cert_chain: vec![env_path("FEDERATION_TLS_CERT")?],
+        key: env_path("FEDERATION_TLS_KEY")?,
+    };
+    let roots = std::env::var("FEDERATION_TLS_ROOTS")
+        .unwrap_or_default()
+        .split(',')
+        .filter(|path| !path.is_empty())
+        .map(|path| std::fs::read(path).with_context(|| format!("reading root {path}")))
+        .collect::<Result<Vec<_>>>()?;
+
+    let transport = QuicTransport::bind(addr, identity, &roots, TransportSettings::default())?;
+    Ok(Arc::new(transport))
+}
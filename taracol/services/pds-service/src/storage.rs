@@ -1 +1,10 @@
-// TODO: Implement storage layer
+//! PDS storage.
+//!
+//! Repository blocks (records, MST nodes, commits) live in the local
+//! content-addressed block store and are served straight from mapped
+//! segment files. Postgres (DATABASE_URL) holds only metadata such as
+//! accounts, repo heads and record indexes, never block bytes.
+
+pub mod blockstore;
+
+pub use blockstore::{Block, BlockStore, BlockStoreConfig, Cid, CompactionStats};
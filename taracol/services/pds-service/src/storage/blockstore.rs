@@ -0,0 +1,485 @@
+//! Content-addressed block store on append-only segment files.
+//!
+//! Each block is appended to the active segment as `[len u32 LE][cid][data]`.
+//! Segments are memory-mapped for reads, so `get` hands out a view into the
+//! mapping instead of copying. An in-memory CID -> location index is rebuilt
+//! by scanning segments on open; a torn record left by a crash is truncated.
+//! `compact` rewrites sealed segments without unreachable blocks.
+
+use std::collections::{BTreeMap, HashMap, HashSet};
+use std::fmt;
+use std::fs::{self, File, OpenOptions};
+use std::io::{BufWriter, Write};
+use std::ops::{Deref, Range};
+use std::path::{Path, PathBuf};
+use std::sync::{Arc, Mutex, PoisonError, RwLock, RwLockReadGuard, RwLockWriteGuard};
+
+use anyhow::{ensure, Context, Result};
+use memmap2::Mmap;
+use ring::digest;
+use tracing::warn;
+
+/// CIDv1 with a sha2-256 multihash: version, codec, 0x12, 0x20, digest
+pub const CID_LEN: usize = 36;
+pub const DAG_CBOR: u8 = 0x71;
+pub const RAW: u8 = 0x55;
+
+const HEADER_LEN: usize = 4 + CID_LEN;
+
+#[derive(Clone, Copy, PartialEq, Eq, Hash)]
+pub struct Cid([u8; CID_LEN]);
+
+impl Cid {
+    pub fn for_block(codec: u8, data: &[u8]) -> Self {
+        let mut bytes = [0u8; CID_LEN];
+        bytes[..4].copy_from_slice(&[0x01, codec, 0x12, 0x20]);
+        bytes[4..].copy_from_slice(digest::digest(&digest::SHA256, data).as_ref());
+        Cid(bytes)
+    }
+
+    /// Parse binary CIDv1/sha2-256 bytes; codecs must be single-byte varints.
+    pub fn from_bytes(bytes: &[u8]) -> Option<Self> {
+        let bytes: [u8; CID_LEN] = bytes.try_into().ok()?;
+        let valid = bytes[0] == 0x01 && bytes[1] < 0x80 && bytes[2] == 0x12 && bytes[3] == 0x20;
+        valid.then_some(Cid(bytes))
+    }
+
+    pub fn as_bytes(&self) -> &[u8] {
+        &self.0
+    }
+
+    pub fn codec(&self) -> u8 {
+        self.0[1]
+    }
+}
+
+impl fmt::Debug for Cid {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        write!(f, "Cid(")?;
+        for byte in &self.0 {
+            write!(f, "{byte:02x}")?;
+        }
+        write!(f, ")")
+    }
+}
+
+/// A block viewed in place in its mapped segment. Cloning is cheap, and the
+/// mapping stays valid even if compaction deletes the segment file.
+#[derive(Clone)]
+pub struct Block {
+    map: Arc<Mmap>,
+    range: Range<usize>,
+}
+
+impl Deref for Block {
+    type Target = [u8];
+
+    fn deref(&self) -> &[u8] {
+        &self.map[self.range.clone()]
+    }
+}
+
+impl AsRef<[u8]> for Block {
+    fn as_ref(&self) -> &[u8] {
+        self
+    }
+}
+
+#[derive(Debug, Clone)]
+pub struct BlockStoreConfig {
+    /// The active segment is sealed and a new one started past this size
+    pub max_segment_bytes: u64,
+}
+
+impl Default for BlockStoreConfig {
+    fn default() -> Self {
+        Self {
+            max_segment_bytes: 256 * 1024 * 1024,
+        }
+    }
+}
+
+#[derive(Debug, Clone, Copy, Default, PartialEq, Eq)]
+pub struct CompactionStats {
+    pub live_blocks: usize,
+    pub dropped_blocks: usize,
+    pub segments_removed: usize,
+}
+
+#[derive(Debug, Clone, Copy)]
+struct Location {
+    segment: u32,
+    offset: u64,
+    len: u32,
+}
+
+struct Segment {
+    file: File,
+    // Covers a prefix of the file; the active segment is remapped on demand
+    map: Option<Arc<Mmap>>,
+}
+
+struct Inner {
+    dir: PathBuf,
+    config: BlockStoreConfig,
+    segments: BTreeMap<u32, Segment>,
+    index: HashMap<Cid, Location>,
+    active_id: u32,
+    active_len: u64,
+    // CIDs put again while a compaction copies; they survive even if dropped
+    pinned: Option<HashSet<Cid>>,
+    // A failed append left bytes that could not be truncated
+    torn: bool,
+}
+
+pub struct BlockStore {
+    inner: RwLock<Inner>,
+    compacting: Mutex<()>,
+}
+
+fn segment_path(dir: &Path, id: u32) -> PathBuf {
+    dir.join(format!("{id:08}.seg"))
+}
+
+fn map_file(file: &File) -> Result<Arc<Mmap>> {
+    // SAFETY: segments are append-only and never truncated while open, so
+    // the mapped bytes never change underneath readers.
+    Ok(Arc::new(unsafe { Mmap::map(file)? }))
+}
+
+/// Index every complete record in `map`, returning the length of the valid
+/// prefix (anything after it is a torn write).
+fn index_segment(id: u32, map: &[u8], index: &mut HashMap<Cid, Location>) -> u64 {
+    let mut offset = 0;
+    while offset + HEADER_LEN <= map.len() {
+        let len = u32::from_le_bytes(map[offset..offset + 4].try_into().unwrap());
+        let end = offset + HEADER_LEN + len as usize;
+        let Some(cid) = Cid::from_bytes(&map[offset + 4..offset + HEADER_LEN]) else {
+            break;
+        };
+        if end > map.len() {
+            break;
+        }
+        index.insert(
+            cid,
+            Location {
+                segment: id,
+                offset: (offset + HEADER_LEN) as u64,
+                len,
+            },
+        );
+        offset = end;
+    }
+    offset as u64
+}
+
+/// Write `blocks` as segment `id` to a new file at `path`, returning where
+/// each block landed.
+fn write_segment(path: &Path, id: u32, blocks: &[(Cid, Location, Block)]) -> Result<Vec<Location>> {
+    let mut out = BufWriter::new(File::create(path)?);
+    let mut locations = Vec::with_capacity(blocks.len());
+    let mut offset = 0;
+    for (cid, location, block) in blocks {
+        out.write_all(&location.len.to_le_bytes())?;
+        out.write_all(cid.as_bytes())?;
+        out.write_all(block)?;
+        locations.push(Location {
+            segment: id,
+            offset: offset + HEADER_LEN as u64,
+            len: location.len,
+        });
+        offset += (HEADER_LEN + block.len()) as u64;
+    }
+    out.into_inner().map_err(|error| error.into_error())?.sync_data()?;
+    Ok(locations)
+}
+
+impl BlockStore {
+    /// Open (or create) the store in `dir`, rebuilding the index from disk.
+    pub fn open(dir: impl Into<PathBuf>, config: BlockStoreConfig) -> Result<Self> {
+        let dir = dir.into();
+        fs::create_dir_all(&dir).with_context(|| format!("creating {}", dir.display()))?;
+
+        let mut ids: Vec<u32> = fs::read_dir(&dir)?
+            .filter_map(|entry| {
+                let name = entry.ok()?.file_name();
+                name.to_str()?.strip_suffix(".seg")?.parse().ok()
+            })
+            .collect();
+        ids.sort_unstable();
+
+        let mut segments = BTreeMap::new();
+        let mut index = HashMap::new();
+        let mut active_len = 0;
+        for &id in &ids {
+            let path = segment_path(&dir, id);
+            let file = OpenOptions::new().read(true).append(true).open(&path)?;
+            let file_len = file.metadata()?.len();
+            let mut map = if file_len > 0 { Some(map_file(&file)?) } else { None };
+            let valid_len = map.as_ref().map_or(0, |map| index_segment(id, map, &mut index));
+            if valid_len < file_len {
+                warn!(path = %path.display(), bytes = file_len - valid_len, "truncating torn segment tail");
+                map = None;
+                file.set_len(valid_len)?;
+                if valid_len > 0 {
+                    map = Some(map_file(&file)?);
+                }
+            }
+            active_len = valid_len;
+            segments.insert(id, Segment { file, map });
+        }
+
+        let active_id = match ids.last() {
+            Some(&id) => id,
+            None => {
+                let file = OpenOptions::new()
+                    .read(true)
+                    .append(true)
+                    .create(true)
+                    .open(segment_path(&dir, 0))?;
+                segments.insert(0, Segment { file, map: None });
+                0
+            }
+        };
+
+        Ok(Self {
+            inner: RwLock::new(Inner {
+                dir,
+                config,
+                segments,
+                index,
+                active_id,
+                active_len,
+                pinned: None,
+                torn: false,
+            }),
+            compacting: Mutex::new(()),
+        })
+    }
+
+    fn read(&self) -> RwLockReadGuard<'_, Inner> {
+        self.inner.read().unwrap_or_else(PoisonError::into_inner)
+    }
+
+    fn write(&self) -> RwLockWriteGuard<'_, Inner> {
+        self.inner.write().unwrap_or_else(PoisonError::into_inner)
+    }
+
+    /// Store a block and return its CID; storing known content is a no-op.
+    pub fn put(&self, codec: u8, data: &[u8]) -> Result<Cid> {
+        let cid = Cid::for_block(codec, data);
+        self.write().put(&cid, data)?;
+        Ok(cid)
+    }
+
+    /// Store many blocks (e.g. a repo import) under one lock.
+    pub fn put_many<'a>(&self, blocks: impl IntoIterator<Item = (u8, &'a [u8])>) -> Result<Vec<Cid>> {
+        let mut inner = self.write();
+        let mut cids = Vec::new();
+        for (codec, data) in blocks {
+            let cid = Cid::for_block(codec, data);
+            inner.put(&cid, data)?;
+            cids.push(cid);
+        }
+        Ok(cids)
+    }
+
+    /// Zero-copy read of a block.
+    pub fn get(&self, cid: &Cid) -> Result<Option<Block>> {
+        {
+            let inner = self.read();
+            let Some(location) = inner.index.get(cid).copied() else {
+                return Ok(None);
+            };
+            if let Some(block) = inner.block_at(location) {
+                return Ok(Some(block));
+            }
+        }
+        // Appended to the active segment after it was last mapped
+        let mut inner = self.write();
+        let Some(location) = inner.index.get(cid).copied() else {
+            return Ok(None);
+        };
+        inner.remap(location.segment)?;
+        Ok(inner.block_at(location))
+    }
+
+    pub fn contains(&self, cid: &Cid) -> bool {
+        self.read().index.contains_key(cid)
+    }
+
+    pub fn len(&self) -> usize {
+        self.read().index.len()
+    }
+
+    pub fn is_empty(&self) -> bool {
+        self.len() == 0
+    }
+
+    /// Flush the active segment to disk.
+    pub fn sync(&self) -> Result<()> {
+        let inner = self.read();
+        inner.segments[&inner.active_id].file.sync_data()?;
+        Ok(())
+    }
+
+    /// Rewrite all sealed segments keeping only blocks `is_live` accepts
+    /// (typically those reachable from current repo heads) into one, then
+    /// delete the old files. Sealed segments never change, so live blocks
+    /// are copied without the store lock; readers and writers only wait
+    /// while the rewritten segment is swapped in.
+    pub fn compact(&self, mut is_live: impl FnMut(&Cid) -> bool) -> Result<CompactionStats> {
+        let _compacting = self.compacting.lock().unwrap_or_else(PoisonError::into_inner);
+        let (dir, sealed, blocks) = {
+            let mut inner = self.write();
+            inner.roll()?;
+            let active_id = inner.active_id;
+            let sealed: Vec<u32> = inner.segments.range(..active_id).map(|(id, _)| *id).collect();
+            let mut blocks = Vec::new();
+            for (cid, location) in &inner.index {
+                if location.segment < active_id {
+                    let block = inner.block_at(*location).context("block outside its segment")?;
+                    blocks.push((*cid, *location, block));
+                }
+            }
+            inner.pinned = Some(HashSet::new());
+            (inner.dir.clone(), sealed, blocks)
+        };
+        let Some(&target) = sealed.last() else {
+            self.write().pinned = None;
+            return Ok(CompactionStats::default());
+        };
+
+        let (mut live, dropped): (Vec<_>, Vec<_>) = blocks.into_iter().partition(|(cid, _, _)| is_live(cid));
+        // Copy in segment order so the old files are read sequentially
+        live.sort_unstable_by_key(|(_, location, _)| (location.segment, location.offset));
+        let tmp = dir.join("compact.tmp");
+        let written = write_segment(&tmp, target, &live);
+
+        let mut inner = self.write();
+        let pinned = inner.pinned.take().unwrap_or_default();
+        let locations = written?;
+        let mut stats = CompactionStats {
+            live_blocks: live.len(),
+            ..CompactionStats::default()
+        };
+        for (cid, _, block) in &dropped {
+            if pinned.contains(cid) {
+                inner.append(cid, block)?;
+            } else {
+                inner.index.remove(cid);
+                stats.dropped_blocks += 1;
+            }
+        }
+        inner.segments[&inner.active_id].file.sync_data()?;
+
+        // The rewritten segment replaces the newest sealed one in place
+        let path = segment_path(&dir, target);
+        fs::rename(&tmp, &path)?;
+        let file = OpenOptions::new().read(true).append(true).open(&path)?;
+        let map = if locations.is_empty() { None } else { Some(map_file(&file)?) };
+        inner.segments.insert(target, Segment { file, map });
+        for ((cid, _, _), location) in live.iter().zip(locations) {
+            inner.index.insert(*cid, location);
+        }
+        let removed = &sealed[..sealed.len() - 1];
+        for id in removed {
+            inner.segments.remove(id);
+        }
+        drop(inner);
+
+        for id in removed {
+            fs::remove_file(segment_path(&dir, *id))?;
+            stats.segments_removed += 1;
+        }
+        Ok(stats)
+    }
+}
+
+impl Inner {
+    fn block_at(&self, location: Location) -> Option<Block> {
+        let map = self.segments.get(&location.segment)?.map.as_ref()?;
+        let start = location.offset as usize;
+        let end = start + location.len as usize;
+        (end <= map.len()).then(|| Block {
+            map: Arc::clone(map),
+            range: start..end,
+        })
+    }
+
+    fn remap(&mut self, id: u32) -> Result<()> {
+        let segment = self.segments.get_mut(&id).context("segment was removed")?;
+        segment.map = Some(map_file(&segment.file)?);
+        Ok(())
+    }
+
+    /// Append `data` unless `cid` is already stored.
+    fn put(&mut self, cid: &Cid, data: &[u8]) -> Result<()> {
+        if !self.index.contains_key(cid) {
+            return self.append(cid, data);
+        }
+        if let Some(pinned) = &mut self.pinned {
+            pinned.insert(*cid);
+        }
+        Ok(())
+    }
+
+    fn append(&mut self, cid: &Cid, data: &[u8]) -> Result<()> {
+        ensure!(!self.torn, "a failed write left a torn record; reopen the store to repair it");
+        if self.active_len >= self.config.max_segment_bytes {
+            self.roll()?;
+        }
+        let len = u32::try_from(data.len()).context("block larger than 4 GiB")?;
+        let mut record = Vec::with_capacity(HEADER_LEN + data.len());
+        record.extend_from_slice(&len.to_le_bytes());
+        record.extend_from_slice(cid.as_bytes());
+        record.extend_from_slice(data);
+
+        let active = self
+            .segments
+            .get_mut(&self.active_id)
+            .expect("active segment is always open");
+        if let Err(error) = active.file.write_all(&record) {
+            // Drop the partial record so the next append starts on a record
+            // boundary; open() truncates it if this fails too
+            if active.file.set_len(self.active_len).is_err() {
+                self.torn = true;
+            }
+            return Err(error.into());
+        }
+        self.index.insert(
+            *cid,
+            Location {
+                segment: self.active_id,
+                offset: self.active_len + HEADER_LEN as u64,
+                len,
+            },
+        );
+        self.active_len += record.len() as u64;
+        Ok(())
+    }
+
+    /// Seal the active segment and start a new one.
+    fn roll(&mut self) -> Result<()> {
+        if self.active_len == 0 {
+            return Ok(());
+        }
+        let active = self
+            .segments
+            .get_mut(&self.active_id)
+            .expect("active segment is always open");
+        active.file.sync_data()?;
+        active.map = Some(map_file(&active.file)?);
+
+        let id = self.active_id + 1;
+        let file = OpenOptions::new()
+            .read(true)
+            .append(true)
+            .create_new(true)
+            .open(segment_path(&self.dir, id))?;
+        self.segments.insert(id, Segment { file, map: None });
+        self.active_id = id;
+        self.active_len = 0;
+        Ok(())
+    }
+}
@@ -0,0 +1,127 @@
+use std::collections::HashSet;
+use std::fs::{self, OpenOptions};
+use std::io::Write;
+use std::path::PathBuf;
+use std::sync::atomic::{AtomicUsize, Ordering};
+
+use pds_service::storage::blockstore::{BlockStore, BlockStoreConfig, Cid, DAG_CBOR, RAW};
+
+struct TempDir(PathBuf);
+
+impl TempDir {
+    fn new() -> Self {
+        static NEXT: AtomicUsize = AtomicUsize::new(0);
+        let name = format!("pds-blockstore-{}-{}", std::process::id(), NEXT.fetch_add(1, Ordering::Relaxed));
+        TempDir(std::env::temp_dir().join(name))
+    }
+}
+
+impl Drop for TempDir {
+    fn drop(&mut self) {
+        let _ = fs::remove_dir_all(&self.0);
+    }
+}
+
+fn small_segments() -> BlockStoreConfig {
+    BlockStoreConfig { max_segment_bytes: 256 }
+}
+
+#[test]
+fn put_then_get_round_trips_and_dedupes() {
+    let dir = TempDir::new();
+    let store = BlockStore::open(&dir.0, BlockStoreConfig::default()).unwrap();
+
+    let cid = store.put(DAG_CBOR, b"record").unwrap();
+    assert_eq!(store.put(DAG_CBOR, b"record").unwrap(), cid);
+    assert_eq!(store.len(), 1);
+    assert_eq!(&*store.get(&cid).unwrap().unwrap(), b"record");
+    assert_ne!(Cid::for_block(RAW, b"record"), cid);
+}
+
+#[test]
+fn index_is_rebuilt_on_open() {
+    let dir = TempDir::new();
+    let cids: Vec<Cid> = {
+        let store = BlockStore::open(&dir.0, small_segments()).unwrap();
+        let blocks: Vec<Vec<u8>> = (0..50).map(|i| format!("block {i}").into_bytes()).collect();
+        store.put_many(blocks.iter().map(|block| (RAW, block.as_slice()))).unwrap()
+    };
+
+    let store = BlockStore::open(&dir.0, small_segments()).unwrap();
+    assert_eq!(store.len(), 50);
+    for (i, cid) in cids.iter().enumerate() {
+        assert_eq!(&*store.get(cid).unwrap().unwrap(), format!("block {i}").as_bytes());
+    }
+}
+
+#[test]
+fn torn_tail_is_truncated() {
+    let dir = TempDir::new();
+    let cid = {
+        let store = BlockStore::open(&dir.0, BlockStoreConfig::default()).unwrap();
+        store.put(RAW, b"complete").unwrap()
+    };
+    let segment = dir.0.join("00000000.seg");
+    let mut file = OpenOptions::new().append(true).open(&segment).unwrap();
+    file.write_all(&[0xff, 0x00, 0x00]).unwrap();
+
+    let store = BlockStore::open(&dir.0, BlockStoreConfig::default()).unwrap();
+    assert_eq!(&*store.get(&cid).unwrap().unwrap(), b"complete");
+    let other = store.put(RAW, b"after recovery").unwrap();
+    assert_eq!(&*store.get(&other).unwrap().unwrap(), b"after recovery");
+}
+
+#[test]
+fn compaction_keeps_live_blocks_only() {
+    let dir = TempDir::new();
+    let store = BlockStore::open(&dir.0, small_segments()).unwrap();
+    let cids: Vec<Cid> = (0..40)
+        .map(|i| store.put(RAW, format!("block {i}").as_bytes()).unwrap())
+        .collect();
+    let live: HashSet<Cid> = cids.iter().step_by(2).copied().collect();
+    let held = store.get(&cids[1]).unwrap().unwrap();
+
+    let stats = store.compact(|cid| live.contains(cid)).unwrap();
+    assert_eq!(stats.live_blocks, 20);
+    assert_eq!(stats.dropped_blocks, 20);
+    assert!(stats.segments_removed > 0);
+
+    assert_eq!(&*held, b"block 1");
+    for (i, cid) in cids.iter().enumerate() {
+        let block = store.get(cid).unwrap();
+        assert_eq!(block.is_some(), i % 2 == 0);
+    }
+    drop(store);
+    assert_eq!(BlockStore::open(&dir.0, small_segments()).unwrap().len(), 20);
+}
+
+#[test]
+fn writes_during_compaction_are_kept() {
+    let dir = TempDir::new();
+    let store = BlockStore::open(&dir.0, small_segments()).unwrap();
+    let cids: Vec<Cid> = (0..40)
+        .map(|i| store.put(RAW, format!("block {i}").as_bytes()).unwrap())
+        .collect();
+    let live: HashSet<Cid> = cids.iter().step_by(2).copied().collect();
+
+    // is_live runs without the store lock held, so it can write. Putting a
+    // block that is about to be dropped keeps it.
+    let mut fresh = None;
+    let stats = store
+        .compact(|cid| {
+            if *cid == cids[1] {
+                store.put(RAW, b"block 1").unwrap();
+                fresh = Some(store.put(RAW, b"written during compaction").unwrap());
+            }
+            live.contains(cid)
+        })
+        .unwrap();
+    assert_eq!(stats.live_blocks, 20);
+    assert_eq!(stats.dropped_blocks, 19);
+
+    assert_eq!(&*store.get(&cids[1]).unwrap().unwrap(), b"block 1");
+    assert_eq!(&*store.get(&fresh.unwrap()).unwrap().unwrap(), b"written during compaction");
+    assert!(store.get(&cids[3]).unwrap().is_none());
+    drop(store);
+    assert_eq!(BlockStore::open(&dir.0, small_segments()).unwrap().len(), 22);
+}
@@ -0,0 +1,83 @@
+//! Local subscriber-swarm load test for the relay firehose.
+//!
+//!     cargo run --release -p relay-service --example subscriber_swarm -- \
+//!         [subscribers=1000] [events=100000] [payload_bytes=256] [ring_capacity=4096]
+//!
+//! Every subscriber replays from cursor 0 while the publisher runs flat out;
+//! evicted subscribers resume from their cursor, as real clients would.
+
+use std::sync::atomic::{AtomicU64, Ordering};
+use std::sync::Arc;
+use std::time::Instant;
+
+use relay_service::firehose::{Firehose, FirehoseConfig, MemoryEventStore, SubscriptionError};
+
+#[tokio::main]
+async fn main() -> anyhow::Result<()> {
+    let mut args = std::env::args().skip(1).map(|arg| arg.parse::<usize>());
+    let subscribers = args.next().transpose()?.unwrap_or(1_000);
+    let events = args.next().transpose()?.unwrap_or(100_000);
+    let payload_bytes = args.next().transpose()?.unwrap_or(256);
+    let ring_capacity = args.next().transpose()?.unwrap_or(4096);
+
+    let config = FirehoseConfig {
+        ring_capacity,
+        ..FirehoseConfig::default()
+    };
+    let firehose = Firehose::new(MemoryEventStore::new(events), config);
+    let delivered = Arc::new(AtomicU64::new(0));
+    let evictions = Arc::new(AtomicU64::new(0));
+    let last_seq = events as u64;
+
+    let mut tasks = Vec::with_capacity(subscribers);
+    for _ in 0..subscribers {
+        let firehose = Arc::clone(&firehose);
+        let delivered = Arc::clone(&delivered);
+        let evictions = Arc::clone(&evictions);
+        tasks.push(tokio::spawn(async move {
+            let mut subscription = firehose.subscribe(Some(0))?;
+            while subscription.cursor() < last_seq {
+                match subscription.next().await {
+                    Ok(_) => {
+                        delivered.fetch_add(1, Ordering::Relaxed);
+                    }
+                    Err(SubscriptionError::ConsumerTooSlow { cursor }) => {
+                        evictions.fetch_add(1, Ordering::Relaxed);
+                        subscription = firehose.subscribe(Some(cursor))?;
+                    }
+                    Err(error) => return Err(anyhow::Error::new(error)),
+                }
+            }
+            Ok::<_, anyhow::Error>(())
+        }));
+    }
+
+    let payload: Arc<[u8]> = vec![0u8; payload_bytes].into();
+    let started = Instant::now();
+    for i in 0..events {
+        firehose.publish(Arc::clone(&payload))?;
+        if i % 256 == 0 {
+            tokio::task::yield_now().await;
+        }
+    }
+    let publish_time = started.elapsed();
+    for task in tasks {
+        task.await??;
+    }
+    let total_time = started.elapsed();
+
+    let delivered = delivered.load(Ordering::Relaxed);
+    println!("subscribers:     {subscribers}");
+    println!("events:          {events} x {payload_bytes} B (ring {ring_capacity})");
+    println!(
+        "publish:         {:.0} events/s",
+        events as f64 / publish_time.as_secs_f64()
+    );
+    println!(
+        "fan-out:         {:.0} deliveries/s ({delivered} total)",
+        delivered as f64 / total_time.as_secs_f64()
+    );
+    println!("evictions:       {}", evictions.load(Ordering::Relaxed));
+    println!("elapsed:         {:.2?}", total_time);
+    Ok(())
+}
@@ -0,0 +1,259 @@
+//! Event firehose: a bounded broadcast ring with cursor-based replay.
+//!
+//! Live events fan out through a fixed-size `tokio::sync::broadcast` ring, so
+//! memory stays bounded however many subscribers connect. A subscriber that
+//! falls a full ring behind is evicted with `ConsumerTooSlow` and reconnects
+//! with its cursor to replay the gap from the `EventStore` instead.
+//!
+//! A replaying subscriber only joins the ring once it has caught up, so a
+//! long replay cannot overrun a receiver it is not reading yet.
+
+use std::collections::VecDeque;
+use std::fmt;
+use std::sync::{Arc, Mutex, PoisonError, RwLock};
+
+use anyhow::Result;
+use tokio::sync::broadcast::{self, error::RecvError};
+
+#[derive(Debug, Clone, PartialEq, Eq)]
+pub struct Event {
+    pub seq: u64,
+    pub payload: Arc<[u8]>,
+}
+
+/// Durable event log that subscribers replay from. Sequence numbers start
+/// at 1 and are contiguous.
+pub trait EventStore: Send + Sync + 'static {
+    fn append(&self, event: Arc<Event>) -> Result<()>;
+    /// Up to `limit` events with `seq >= from`, in order. A store that has
+    /// pruned `from` returns its oldest events; the subscriber reports the
+    /// gap as `OutdatedCursor` rather than skipping it.
+    fn read_from(&self, from: u64, limit: usize) -> Result<Vec<Arc<Event>>>;
+    /// Highest stored seq, or 0 when empty
+    fn head(&self) -> u64;
+}
+
+#[derive(Debug, Clone)]
+pub struct FirehoseConfig {
+    /// Events held in memory for live fan-out. Bounds memory use and how far
+    /// a live subscriber may lag before it is evicted.
+    pub ring_capacity: usize,
+    /// Events read from storage per replay page
+    pub replay_page: usize,
+}
+
+impl Default for FirehoseConfig {
+    fn default() -> Self {
+        Self {
+            ring_capacity: 4096,
+            replay_page: 512,
+        }
+    }
+}
+
+#[derive(Debug, Clone, PartialEq, Eq)]
+pub enum SubscriptionError {
+    /// Fell a full ring behind the live stream; resubscribe from `cursor`
+    ConsumerTooSlow { cursor: u64 },
+    /// Requested cursor is ahead of the stream
+    FutureCursor { head: u64 },
+    /// Events after the cursor were pruned; the oldest one still stored is
+    /// `oldest`
+    OutdatedCursor { oldest: u64 },
+    Storage(String),
+    Closed,
+}
+
+impl fmt::Display for SubscriptionError {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        match self {
+            SubscriptionError::ConsumerTooSlow { cursor } => {
+                write!(f, "consumer too slow; resume from cursor {cursor}")
+            }
+            SubscriptionError::FutureCursor { head } => {
+                write!(f, "cursor is ahead of the stream head {head}")
+            }
+            SubscriptionError::OutdatedCursor { oldest } => {
+                write!(f, "cursor is older than the retained events (oldest seq {oldest})")
+            }
+            SubscriptionError::Storage(message) => write!(f, "event store error: {message}"),
+            SubscriptionError::Closed => f.write_str("firehose closed"),
+        }
+    }
+}
+
+impl std::error::Error for SubscriptionError {}
+
+pub struct Firehose<S> {
+    store: S,
+    sender: broadcast::Sender<Arc<Event>>,
+    // Guards seq assignment so events reach the store and the ring in order
+    next_seq: Mutex<u64>,
+    config: FirehoseConfig,
+}
+
+impl<S: EventStore> Firehose<S> {
+    pub fn new(store: S, config: FirehoseConfig) -> Arc<Self> {
+        let (sender, _) = broadcast::channel(config.ring_capacity.max(1));
+        let next_seq = store.head() + 1;
+        Arc::new(Self {
+            store,
+            sender,
+            next_seq: Mutex::new(next_seq),
+            config,
+        })
+    }
+
+    /// Persist one event and fan it out, returning its seq.
+    pub fn publish(&self, payload: impl Into<Arc<[u8]>>) -> Result<u64> {
+        let mut next_seq = self.next_seq.lock().unwrap_or_else(PoisonError::into_inner);
+        let event = Arc::new(Event {
+            seq: *next_seq,
+            payload: payload.into(),
+        });
+        self.store.append(event.clone())?;
+        *next_seq += 1;
+        // Having no live subscribers is fine; the event is already stored
+        let _ = self.sender.send(event.clone());
+        Ok(event.seq)
+    }
+
+    pub fn head(&self) -> u64 {
+        self.store.head()
+    }
+
+    pub fn subscriber_count(&self) -> usize {
+        self.sender.receiver_count()
+    }
+
+    /// Subscribe to live events, or replay everything after `cursor` first.
+    pub fn subscribe(self: &Arc<Self>, cursor: Option<u64>) -> Result<Subscription<S>, SubscriptionError> {
+        // Hold the publish lock so no event lands between the live receiver
+        // and the cursor it starts from.
+        let next_seq = self.next_seq.lock().unwrap_or_else(PoisonError::into_inner);
+        let head = *next_seq - 1;
+        let live = match cursor {
+            Some(cursor) if cursor > head => return Err(SubscriptionError::FutureCursor { head }),
+            Some(_) => None,
+            None => Some(self.sender.subscribe()),
+        };
+        drop(next_seq);
+
+        Ok(Subscription {
+            firehose: Arc::clone(self),
+            live,
+            backlog: VecDeque::new(),
+            cursor: cursor.unwrap_or(head),
+        })
+    }
+}
+
+/// One subscriber's position in the firehose.
+pub struct Subscription<S> {
+    firehose: Arc<Firehose<S>>,
+    // None while replaying from the store
+    live: Option<broadcast::Receiver<Arc<Event>>>,
+    backlog: VecDeque<Arc<Event>>,
+    cursor: u64,
+}
+
+impl<S: EventStore> Subscription<S> {
+    /// Seq of the last event returned by `next`
+    pub fn cursor(&self) -> u64 {
+        self.cursor
+    }
+
+    pub async fn next(&mut self) -> Result<Arc<Event>, SubscriptionError> {
+        loop {
+            if let Some(event) = self.backlog.pop_front() {
+                self.cursor = event.seq;
+                return Ok(event);
+            }
+            let Some(live) = self.live.as_mut() else {
+                let page = self.read_page()?;
+                if page.is_empty() {
+                    // Caught up: with publishing paused, drain what landed
+                    // since the last page, then join the ring at that point
+                    let firehose = Arc::clone(&self.firehose);
+                    let _next_seq = firehose.next_seq.lock().unwrap_or_else(PoisonError::into_inner);
+                    let page = self.read_page()?;
+                    if page.is_empty() {
+                        self.live = Some(firehose.sender.subscribe());
+                    }
+                    self.backlog.extend(page);
+                } else {
+                    self.backlog.extend(page);
+                }
+                continue;
+            };
+            match live.recv().await {
+                // Already delivered during replay
+                Ok(event) if event.seq <= self.cursor => continue,
+                Ok(event) => {
+                    self.cursor = event.seq;
+                    return Ok(event);
+                }
+                Err(RecvError::Lagged(_)) => {
+                    return Err(SubscriptionError::ConsumerTooSlow { cursor: self.cursor });
+                }
+                Err(RecvError::Closed) => return Err(SubscriptionError::Closed),
+            }
+        }
+    }
+
+    /// The next replay page after the cursor, refusing to skip pruned events
+    fn read_page(&self) -> Result<Vec<Arc<Event>>, SubscriptionError> {
+        let page = self
+            .firehose
+            .store
+            .read_from(self.cursor + 1, self.firehose.config.replay_page)
+            .map_err(|error| SubscriptionError::Storage(error.to_string()))?;
+        match page.first() {
+            Some(first) if first.seq > self.cursor + 1 => {
+                Err(SubscriptionError::OutdatedCursor { oldest: first.seq })
+            }
+            _ => Ok(page),
+        }
+    }
+}
+
+/// In-memory `EventStore` keeping the most recent `retention` events.
+/// Replays from older cursors fail with `OutdatedCursor`.
+pub struct MemoryEventStore {
+    events: RwLock<VecDeque<Arc<Event>>>,
+    retention: usize,
+}
+
+impl MemoryEventStore {
+    pub fn new(retention: usize) -> Self {
+        Self {
+            events: RwLock::new(VecDeque::new()),
+            retention: retention.max(1),
+        }
+    }
+}
+
+impl EventStore for MemoryEventStore {
+    fn append(&self, event: Arc<Event>) -> Result<()> {
+        let mut events = self.events.write().unwrap_or_else(PoisonError::into_inner);
+        if events.len() == self.retention {
+            events.pop_front();
+        }
+        events.push_back(event);
+        Ok(())
+    }
+
+    fn read_from(&self, from: u64, limit: usize) -> Result<Vec<Arc<Event>>> {
+        let events = self.events.read().unwrap_or_else(PoisonError::into_inner);
+        let Some(oldest) = events.front() else {
+            return Ok(Vec::new());
+        };
+        let start = (from.saturating_sub(oldest.seq) as usize).min(events.len());
+        Ok(events.range(start..).take(limit).cloned().collect())
+    }
+
+    fn head(&self) -> u64 {
+        let events = self.events.read().unwrap_or_else(PoisonError::into_inner);
+        events.back().map_or(0, |event| event.seq)
+    }
+}
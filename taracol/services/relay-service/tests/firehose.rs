@@ -0,0 +1,104 @@
+use relay_service::firehose::{Firehose, FirehoseConfig, MemoryEventStore, SubscriptionError};
+
+fn firehose(ring_capacity: usize) -> std::sync::Arc<Firehose<MemoryEventStore>> {
+    let config = FirehoseConfig {
+        ring_capacity,
+        replay_page: 4,
+    };
+    Firehose::new(MemoryEventStore::new(1_000), config)
+}
+
+#[tokio::test]
+async fn live_subscriber_receives_events_in_order() {
+    let firehose = firehose(16);
+    let mut subscription = firehose.subscribe(None).unwrap();
+    for i in 0..5u8 {
+        firehose.publish(vec![i]).unwrap();
+    }
+    for seq in 1..=5 {
+        assert_eq!(subscription.next().await.unwrap().seq, seq);
+    }
+}
+
+#[tokio::test]
+async fn replay_hands_over_to_live_without_gaps() {
+    let firehose = firehose(16);
+    for _ in 0..10 {
+        firehose.publish(vec![0]).unwrap();
+    }
+    let mut subscription = firehose.subscribe(Some(3)).unwrap();
+    for _ in 0..5 {
+        firehose.publish(vec![1]).unwrap();
+    }
+    for seq in 4..=15 {
+        assert_eq!(subscription.next().await.unwrap().seq, seq);
+    }
+}
+
+#[tokio::test]
+async fn slow_consumer_is_evicted_and_can_resume() {
+    let firehose = firehose(8);
+    let mut subscription = firehose.subscribe(None).unwrap();
+    for _ in 0..20 {
+        firehose.publish(vec![0]).unwrap();
+    }
+    let error = subscription.next().await.unwrap_err();
+    assert_eq!(error, SubscriptionError::ConsumerTooSlow { cursor: 0 });
+
+    let mut resumed = firehose.subscribe(Some(0)).unwrap();
+    for seq in 1..=20 {
+        assert_eq!(resumed.next().await.unwrap().seq, seq);
+    }
+}
+
+#[tokio::test]
+async fn publishing_a_ring_during_replay_does_not_evict() {
+    let firehose = firehose(8);
+    for _ in 0..20 {
+        firehose.publish(vec![0]).unwrap();
+    }
+    let mut subscription = firehose.subscribe(Some(0)).unwrap();
+    for seq in 1..=5 {
+        assert_eq!(subscription.next().await.unwrap().seq, seq);
+    }
+    // Far more than ring_capacity lands while the subscriber is replaying
+    for _ in 0..50 {
+        firehose.publish(vec![1]).unwrap();
+    }
+    for seq in 6..=70 {
+        assert_eq!(subscription.next().await.unwrap().seq, seq);
+    }
+    // Caught up, so the next event has to come through the ring
+    let (event, _) = tokio::join!(subscription.next(), async {
+        tokio::task::yield_now().await;
+        firehose.publish(vec![2]).unwrap();
+    });
+    assert_eq!(event.unwrap().seq, 71);
+}
+
+#[tokio::test]
+async fn pruned_cursor_is_reported() {
+    let config = FirehoseConfig {
+        ring_capacity: 8,
+        replay_page: 4,
+    };
+    let firehose = Firehose::new(MemoryEventStore::new(10), config);
+    for _ in 0..30 {
+        firehose.publish(vec![0]).unwrap();
+    }
+    let mut subscription = firehose.subscribe(Some(5)).unwrap();
+    assert_eq!(
+        subscription.next().await.unwrap_err(),
+        SubscriptionError::OutdatedCursor { oldest: 21 }
+    );
+}
+
+#[tokio::test]
+async fn future_cursor_is_rejected() {
+    let firehose = firehose(8);
+    firehose.publish(vec![0]).unwrap();
+    assert!(matches!(
+        firehose.subscribe(Some(5)),
+        Err(SubscriptionError::FutureCursor { head: 1 })
+    ));
+}
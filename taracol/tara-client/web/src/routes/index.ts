@@ -0,0 +1,19 @@
+// Lazy route registry. Each src/routes/<name>/index.tsx is a dynamically
+// imported chunk (route-<name> in vite.config.ts), fetched the first time
+// the route renders inside <Suspense>. Reach route modules only through
+// this registry: a static import pulls the chunk back into first paint.
+import { lazy, type ComponentType, type LazyExoticComponent } from 'react';
+
+type RouteModule = { default: ComponentType };
+
+const modules = import.meta.glob<RouteModule>('./*/index.tsx');
+
+export const routes: Record<string, LazyExoticComponent<ComponentType>> = Object.fromEntries(
+  Object.entries(modules).map(([path, load]) => [path.split('/')[1], lazy(load)]),
+);
+
+/** Start fetching a route's chunk ahead of navigation (e.g. on link hover) */
+export function preloadRoute(name: string): void {
+  const load = modules[`./${name}/index.tsx`];
+  if (load) void load();
+}
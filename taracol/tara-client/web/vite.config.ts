@@ -0,0 +1,62 @@
+import { defineConfig, type Plugin } from 'vite';
+import react from '@vitejs/plugin-react';
+import compression from 'vite-plugin-compression';
+
+const BUNDLE_BUDGETS_KIB: Record<string, number> = {
+  'vendor-react': 150,
+  'vendor-tara-api': 60,
+  index: 100,
+  default: 50,
+};
+
+function chunkFor(id: string): string | undefined {
+  if (id.includes('node_modules')) {
+    if (/node_modules\/(react|react-dom|scheduler)\//.test(id)) return 'vendor-react';
+    if (id.includes('node_modules/@tara/api/')) return 'vendor-tara-api';
+    return 'vendor';
+  }
+  if (id.includes('/packages/tara-api/')) return 'vendor-tara-api';
+  const route = id.match(/\/src\/routes\/([^/]+)\//);
+  return route ? `route-${route[1]}` : undefined;
+}
+
+function bundleBudget(budgets: Record<string, number>): Plugin {
+  return {
+    name: 'tara-bundle-budget',
+    apply: 'build',
+    generateBundle(_options, bundle) {
+      const failures: string[] = [];
+      for (const output of Object.values(bundle)) {
+        if (output.type !== 'chunk') continue;
+        const limit = budgets[output.name] ?? budgets.default;
+        const size = Buffer.byteLength(output.code) / 1024;
+        if (size > limit) {
+          failures.push(`${output.fileName}: ${size.toFixed(1)} KiB > ${limit} KiB`);
+        }
+      }
+      if (failures.length > 0) {
+        this.error(`Bundle budget exceeded:\n  ${failures.join('\n  ')}`);
+      }
+    },
+  };
+}
+
+export default defineConfig({
+  plugins: [
+    react(),
+    compression({ algorithm: 'gzip', ext: '.gz' }),
+    compression({ algorithm: 'brotliCompress', ext: '.br' }),
+    bundleBudget(BUNDLE_BUDGETS_KIB),
+  ],
+  build: {
+    target: 'es2020',
+    sourcemap: true,
+    cssCodeSplit: true,
+    chunkSizeWarningLimit: BUNDLE_BUDGETS_KIB.default,
+    rollupOptions: {
+      output: {
+        manualChunks: chunkFor,
+      },
+    },
+  },
+});
@@ -0,0 +1,5 @@
+//! Cross-crate benchmarks
+
+fn main() {
+    // TODO: Implement
+}
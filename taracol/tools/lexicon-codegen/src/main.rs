@@ -0,0 +1,5 @@
+//! Rust and TypeScript code generation from lexicons
+
+fn main() {
+    // TODO: Implement
+}
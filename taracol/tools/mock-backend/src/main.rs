@@ -0,0 +1,263 @@
+//! Mock gRPC backend for gateway load testing.
+//!
+//! Answers every gRPC method with a unary response after an injected delay,
+//! failing a configurable share of calls, so the gateway's pooling, timeouts
+//! and load shedding can be exercised on one machine without the real
+//! services. The response message is a single unknown protobuf field, which
+//! every prost-generated type decodes (and skips) without error.
+
+use std::convert::Infallible;
+use std::f64::consts::TAU;
+use std::net::SocketAddr;
+use std::str::FromStr;
+use std::sync::atomic::{AtomicU64, Ordering};
+use std::sync::Arc;
+use std::time::Duration;
+
+use anyhow::Result;
+use clap::Parser;
+use hyper::body::Bytes;
+use hyper::header::{HeaderMap, HeaderValue};
+use hyper::service::{make_service_fn, service_fn};
+use hyper::{Body, Request, Response, Server};
+use rand::Rng;
+use tokio::sync::Semaphore;
+use tracing::info;
+
+/// Response delay distribution: `fixed:5ms`, `uniform:2ms..20ms` or
+/// `lognormal:5ms,0.8` (median, sigma)
+#[derive(Debug, Clone)]
+enum Latency {
+    Fixed(Duration),
+    Uniform(Duration, Duration),
+    LogNormal { median: Duration, sigma: f64 },
+}
+
+fn parse_duration(text: &str) -> Result<Duration, String> {
+    let split = text.find(|c: char| !c.is_ascii_digit() && c != '.').unwrap_or(text.len());
+    let (value, unit) = text.split_at(split);
+    let value: f64 = value.parse().map_err(|_| format!("invalid duration {text:?}"))?;
+    let seconds = match unit {
+        "us" => value / 1e6,
+        "ms" => value / 1e3,
+        "s" => value,
+        _ => return Err(format!("duration {text:?} needs a unit (us, ms, s)")),
+    };
+    Ok(Duration::from_secs_f64(seconds))
+}
+
+impl FromStr for Latency {
+    type Err = String;
+
+    fn from_str(text: &str) -> Result<Self, String> {
+        let (kind, params) = text.split_once(':').ok_or("expected <kind>:<params>")?;
+        match kind {
+            "fixed" => Ok(Latency::Fixed(parse_duration(params)?)),
+            "uniform" => {
+                let (low, high) = params.split_once("..").ok_or("expected uniform:<min>..<max>")?;
+                Ok(Latency::Uniform(parse_duration(low)?, parse_duration(high)?))
+            }
+            "lognormal" => {
+                let (median, sigma) = params.split_once(',').ok_or("expected lognormal:<median>,<sigma>")?;
+                let sigma = sigma.parse().map_err(|_| format!("invalid sigma {sigma:?}"))?;
+                Ok(Latency::LogNormal { median: parse_duration(median)?, sigma })
+            }
+            _ => Err(format!("unknown latency kind {kind:?}")),
+        }
+    }
+}
+
+impl Latency {
+    fn sample(&self, rng: &mut impl Rng) -> Duration {
+        match *self {
+            Latency::Fixed(delay) => delay,
+            Latency::Uniform(low, high) if low < high => rng.gen_range(low..=high),
+            Latency::Uniform(low, _) => low,
+            Latency::LogNormal { median, sigma } => {
+                // Box-Muller standard normal
+                let u1: f64 = 1.0 - rng.gen::<f64>();
+                let u2: f64 = rng.gen();
+                let z = (-2.0 * u1.ln()).sqrt() * (TAU * u2).cos();
+                median.mul_f64((sigma * z).exp())
+            }
+        }
+    }
+}
+
+/// Response payload size in bytes: `512` or `256..4096`
+#[derive(Debug, Clone, Copy)]
+struct PayloadSize(usize, usize);
+
+impl FromStr for PayloadSize {
+    type Err = String;
+
+    fn from_str(text: &str) -> Result<Self, String> {
+        let parse = |value: &str| value.parse().map_err(|_| format!("invalid size {value:?}"));
+        match text.split_once("..") {
+            Some((low, high)) => Ok(PayloadSize(parse(low)?, parse(high)?)),
+            None => {
+                let size = parse(text)?;
+                Ok(PayloadSize(size, size))
+            }
+        }
+    }
+}
+
+#[derive(Parser, Debug)]
+#[command(about = "Mock gRPC backend with injectable latency and errors")]
+struct Args {
+    /// Name reported in logs
+    #[arg(long, default_value = "mock")]
+    service: String,
+    #[arg(long, default_value = "127.0.0.1:50001")]
+    listen: SocketAddr,
+    #[arg(long, default_value = "lognormal:5ms,0.5")]
+    latency: Latency,
+    /// Share of calls (0-1) delayed by --spike instead, to model tail events
+    #[arg(long, default_value_t = 0.0)]
+    spike_rate: f64,
+    #[arg(long, default_value = "fixed:250ms")]
+    spike: Latency,
+    /// Share of calls (0-1) failed with --error-code after their delay
+    #[arg(long, default_value_t = 0.0)]
+    error_rate: f64,
+    /// gRPC status for injected failures (14 = UNAVAILABLE)
+    #[arg(long, default_value_t = 14)]
+    error_code: u16,
+    #[arg(long, default_value = "512")]
+    payload_bytes: PayloadSize,
+    /// Calls in flight before answering RESOURCE_EXHAUSTED (0 = unlimited),
+    /// modelling a saturated backend
+    #[arg(long, default_value_t = 0)]
+    max_concurrency: usize,
+}
+
+#[derive(Default)]
+struct Counters {
+    calls: AtomicU64,
+    failures: AtomicU64,
+    rejected: AtomicU64,
+}
+
+struct State {
+    args: Args,
+    limiter: Option<Arc<Semaphore>>,
+    counters: Counters,
+}
+
+/// gRPC frame carrying one length-delimited field 15 of `payload_len` bytes
+fn grpc_frame(payload_len: usize) -> Bytes {
+    let mut message = Vec::with_capacity(payload_len + 6);
+    message.push((15 << 3) | 2);
+    let mut len = payload_len;
+    while len >= 0x80 {
+        message.push((len as u8 & 0x7f) | 0x80);
+        len >>= 7;
+    }
+    message.push(len as u8);
+    message.resize(message.len() + payload_len, 0);
+
+    let mut frame = Vec::with_capacity(5 + message.len());
+    frame.push(0);
+    frame.extend_from_slice(&(message.len() as u32).to_be_bytes());
+    frame.extend_from_slice(&message);
+    frame.into()
+}
+
+/// Trailers-only response: the status travels in the headers
+fn status_only(code: u16, message: &'static str) -> Response<Body> {
+    Response::builder()
+        .header("content-type", "application/grpc")
+        .header("grpc-status", code)
+        .header("grpc-message", message)
+        .body(Body::empty())
+        .expect("static response parts are valid")
+}
+
+async fn handle(request: Request<Body>, state: Arc<State>) -> Result<Response<Body>, Infallible> {
+    // Drain the request so HTTP/2 flow control never stalls the client
+    let _ = hyper::body::to_bytes(request.into_body()).await;
+    state.counters.calls.fetch_add(1, Ordering::Relaxed);
+
+    let _permit = match &state.limiter {
+        Some(limiter) => match Arc::clone(limiter).try_acquire_owned() {
+            Ok(permit) => Some(permit),
+            Err(_) => {
+                state.counters.rejected.fetch_add(1, Ordering::Relaxed);
+                return Ok(status_only(8, "mock backend saturated"));
+            }
+        },
+        None => None,
+    };
+
+    let (delay, fail, payload_len) = {
+        let args = &state.args;
+        let mut rng = rand::thread_rng();
+        let delay = if rng.gen_bool(args.spike_rate.clamp(0.0, 1.0)) {
+            args.spike.sample(&mut rng)
+        } else {
+            args.latency.sample(&mut rng)
+        };
+        let PayloadSize(low, high) = args.payload_bytes;
+        let payload_len = if low < high { rng.gen_range(low..=high) } else { low };
+        (delay, rng.gen_bool(args.error_rate.clamp(0.0, 1.0)), payload_len)
+    };
+    tokio::time::sleep(delay).await;
+
+    if fail {
+        state.counters.failures.fetch_add(1, Ordering::Relaxed);
+        return Ok(status_only(state.args.error_code, "injected failure"));
+    }
+
+    let (mut sender, body) = Body::channel();
+    tokio::spawn(async move {
+        if sender.send_data(grpc_frame(payload_len)).await.is_ok() {
+            let mut trailers = HeaderMap::new();
+            trailers.insert("grpc-status", HeaderValue::from_static("0"));
+            let _ = sender.send_trailers(trailers).await;
+        }
+    });
+    Ok(Response::builder()
+        .header("content-type", "application/grpc")
+        .body(body)
+        .expect("static response parts are valid"))
+}
+
+#[tokio::main]
+async fn main() -> Result<()> {
+    tracing_subscriber::fmt::init();
+    let args = Args::parse();
+    let listen = args.listen;
+    let limiter = (args.max_concurrency > 0).then(|| Arc::new(Semaphore::new(args.max_concurrency)));
+    let state = Arc::new(State {
+        args,
+        limiter,
+        counters: Counters::default(),
+    });
+
+    tokio::spawn({
+        let state = Arc::clone(&state);
+        async move {
+            let mut ticker = tokio::time::interval(Duration::from_secs(10));
+            loop {
+                ticker.tick().await;
+                let counters = &state.counters;
+                info!(
+                    service = %state.args.service,
+                    calls = counters.calls.load(Ordering::Relaxed),
+                    failures = counters.failures.load(Ordering::Relaxed),
+                    rejected = counters.rejected.load(Ordering::Relaxed),
+                    "mock backend stats"
+                );
+            }
+        }
+    });
+
+    let make_service = make_service_fn(move |_| {
+        let state = Arc::clone(&state);
+        async move { Ok::<_, Infallible>(service_fn(move |request| handle(request, Arc::clone(&state)))) }
+    });
+    info!(%listen, "mock backend listening");
+    Server::bind(&listen).http2_only(true).serve(make_service).await?;
+    Ok(())
+}